@@ -21,6 +21,14 @@ def create_app():
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "devkey")
     app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///horarios.db")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # máximo de trabajos (GA / experimentos) corriendo a la vez
+    app.config["TRABAJOS_MAX"] = int(os.environ.get("TRABAJOS_MAX", 1))
+    # versiones del horario que se conservan (contando la activa)
+    app.config["HORARIO_VERSIONES"] = int(os.environ.get("HORARIO_VERSIONES", 10))
+    # tope en segundos de /reparar, que corre dentro de la petición
+    app.config["REPARAR_MAX"] = float(os.environ.get("REPARAR_MAX", 10))
+    # segundos que el panel de inicio reutiliza sus estadísticas (ver panel.py)
+    app.config["PANEL_TTL"] = float(os.environ.get("PANEL_TTL", 30))
 
     db.init_app(app)
     migrate.init_app(app, db)
@@ -0,0 +1,124 @@
+"""Corrida de un experimento: GA, registro en Experimento y gráficas.
+
+Se ejecuta dentro de un trabajo (trabajos.py), fuera de la petición HTTP.
+"""
+import os, json
+
+from . import db
+from .models import Turno, Grupo, Experimento
+from .genetico import generar_horario, get_ga_log, get_tiempos
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+def turnos_de(scope):
+    if scope == "MATUTINO": return [Turno.MATUTINO]
+    if scope == "VESPERTINO": return [Turno.VESPERTINO]
+    return [Turno.MATUTINO, Turno.VESPERTINO]
+
+def _kwargs_ga(p, cancelar, progreso):
+    return dict(
+        generaciones=p["gens"], tam=p["tam"], elite=p["elite"], seed=p["seed"],
+        turnos=turnos_de(p["scope"]), verbose=True, max_seconds=60, early_stop=12,
+        islas=p["islas"], migracion=p["migracion"], memetico=p.get("memetico", 0),
+        engine=p.get("engine", "ga"), cruce=p.get("cruce", "grupos"),
+        torneo=p.get("torneo", 3), reinicios=p.get("reinicios", 2),
+        cancelar=cancelar, progreso=progreso
+    )
+
+def generar(p, cancelar=None, progreso=None):
+    """Trabajo "generar": solo corre el GA y guarda el horario."""
+    best, best_score = generar_horario(**_kwargs_ga(p, cancelar, progreso))
+    return {"best": float(best_score), "genes": len(best or [])}
+
+def _ensure_dir(path): os.makedirs(path, exist_ok=True)
+
+def _save_fig_to_static(fig, rel_path):
+    static_root = os.path.join(os.path.dirname(__file__), "static")
+    full_dir = os.path.join(static_root, os.path.dirname(rel_path))
+    _ensure_dir(full_dir)
+    fig.savefig(os.path.join(static_root, rel_path), bbox_inches="tight")
+    plt.close(fig)
+
+def correr(p, cancelar=None, progreso=None):
+    """Trabajo "experimento": GA, fila de Experimento y sus dos gráficas."""
+    scope = p["scope"]
+    gm = Grupo.query.filter_by(turno=Turno.MATUTINO).count()
+    gv = Grupo.query.filter_by(turno=Turno.VESPERTINO).count()
+    total = gm + gv if scope == "BOTH" else (gm if scope == "MATUTINO" else gv)
+
+    generar_horario(**_kwargs_ga(p, cancelar, progreso))
+
+    log = get_ga_log()
+    if not log:
+        raise RuntimeError("No se obtuvieron datos del GA_LOG.")
+
+    last = log[-1]
+    best_final = float(last.get("best", 0))
+    avg_final  = float(last.get("avg", 0))
+    tiempo     = float(last.get("time_sec", 0))
+    comp_last  = last.get("comp") or {}
+    tiempos    = get_tiempos() or {"fases": {}, "evaluaciones": 0}
+    fases      = {f"tiempo_{k}": v for k, v in tiempos["fases"].items()}
+
+    exp = Experimento(
+        scope=scope, generaciones=p["gens"], poblacion=p["tam"], elite=p["elite"],
+        seed=p["seed"], islas=p["islas"], engine=p.get("engine", "ga"),
+        num_grupos_total=total, num_grupos_m=gm, num_grupos_v=gv,
+        best_final=best_final, avg_final=avg_final, tiempo_total=tiempo,
+        conflictos_docente=int(comp_last.get("conflictos_docente", 0)),
+        violacion_reserva=int(comp_last.get("violacion_reserva", 0)),
+        violacion_disponibilidad=int(comp_last.get("violacion_disponibilidad", 0)),
+        turno_incorrecto=int(comp_last.get("turno_incorrecto", 0)),
+        exceso_sesiones=int(comp_last.get("exceso_sesiones", 0)),
+        falta_sesiones=int(comp_last.get("falta_sesiones", 0)),
+        evaluaciones=tiempos["evaluaciones"], **fases,
+        log_json=json.dumps(log, ensure_ascii=False)
+    )
+    db.session.add(exp); db.session.commit()
+
+    # Fitness
+    gens_x = [e.get("generacion", i+1) for i, e in enumerate(log)]
+    best_y = [float(e.get("best", 0)) for e in log]
+    avg_y  = [float(e.get("avg", 0)) for e in log]
+
+    fig1, ax1 = plt.subplots(figsize=(6,3))
+    ax1.plot(gens_x, best_y, label="Best")
+    ax1.plot(gens_x, avg_y,  label="Avg")
+    ax1.set_title(f"Fitness (Exp {exp.id})")
+    ax1.set_xlabel("Generación"); ax1.set_ylabel("Fitness")
+    ax1.legend()
+    rel1 = f"experimentos/exp_{exp.id}_fitness.png"
+    _save_fig_to_static(fig1, rel1)
+
+    # Restricciones
+    keys = [
+        "conflictos_docente","violacion_reserva","violacion_disponibilidad",
+        "turno_incorrecto","exceso_sesiones","falta_sesiones",
+        "exceso_bloques_dia"
+    ]
+    series = {k:[] for k in keys}
+    for e in log:
+        comp = e.get("comp") or {}
+        for k in keys:
+            series[k].append(float(comp.get(k, 0)))
+
+    fig2, ax2 = plt.subplots(figsize=(6,3))
+    hubo_algo = False
+    for k in keys:
+        if any(v != 0 for v in series[k]):
+            ax2.plot(gens_x, series[k], label=k.replace("_"," "))
+            hubo_algo = True
+    if not hubo_algo:
+        ax2.text(0.5, 0.5, "Sin violaciones registradas",
+                 ha='center', va='center', transform=ax2.transAxes, color="gray")
+    ax2.set_title(f"Restricciones (Exp {exp.id})")
+    ax2.set_xlabel("Generación"); ax2.set_ylabel("Conteo")
+    ax2.legend(fontsize="x-small", ncol=2)
+    rel2 = f"experimentos/exp_{exp.id}_hard.png"
+    _save_fig_to_static(fig2, rel2)
+
+    exp.fig_fitness = rel1; exp.fig_hard = rel2
+    db.session.commit()
+    return {"experimento_id": exp.id, "best": best_final}
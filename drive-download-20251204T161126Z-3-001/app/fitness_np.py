@@ -0,0 +1,247 @@
+"""Evaluación vectorizada (NumPy) de una población completa.
+
+Reproduce exactamente `_fitness` y `_metrics` de genetico.py, que siguen
+siendo la referencia: la población se codifica como un arreglo entero de
+forma (tam, genes, campos) y cada restricción se calcula con operaciones
+sobre arreglos en lugar de diccionarios por individuo.
+"""
+import numpy as np
+from .models import DIAS
+from .genetico import METRICAS
+
+TURNOS = ["MATUTINO", "VESPERTINO"]
+# campos de cada gen codificado
+G, DIA, TU, B1, B2, MAT, DOC, GM = range(8)
+
+
+class EvaluadorLote:
+    def __init__(self, reservas, disp, materias, planes, docentes, fijos=()):
+        """Precalcula índices a partir de los mismos datos que usa genetico.py.
+
+        Los índices de grupo, materia y docente se asignan en orden ascendente
+        de id, pero codificar() agrega al final los ids que no conocía; donde
+        importa el orden de los ids se usa su rango (_rangos), no el índice.
+        `fijos` son genes que no se optimizan pero cuentan para choques y
+        horas de docente.
+        """
+        grupos = sorted({p[0] for p in planes} | {k[0] for k in reservas})
+        mats = sorted(set(materias) | {r[2] for lst in reservas.values() for r in lst})
+        self.gi = {g: i for i, g in enumerate(grupos)}
+        self.mi = {m: i for i, m in enumerate(mats)}
+        self.di = {d: i for i, d in enumerate(sorted(set(docentes) | {k[0] for k in disp}
+                                                     | {f[6] for f in fijos}))}
+        self.B = max([10] + [f[4] + 2 for f in fijos])
+        F = np.array([(self.di[f[6]], DIAS.index(f[1]), TURNOS.index(f[2]), f[3], f[4])
+                      for f in fijos], dtype=np.int64).reshape(-1, 5)
+        self.f_doc, self.f_b1, self.f_b2 = F[:, 0], F[:, 3], F[:, 4]
+        self.f_bd = self._bucket(F[:, 0], F[:, 1], F[:, 2])
+
+        # (grupo, materia): claves del plan y de cualquier gen que aparezca
+        self.gm = {}
+        for (g, mat, ses, dur, turno) in planes:
+            self.gm.setdefault((g, mat), len(self.gm))
+        self.plan_gm = np.array([self.gm[(p[0], p[1])] for p in planes], dtype=np.int64)
+        self.plan_ses = np.array([p[2] for p in planes], dtype=np.int64)
+
+        self.mat_turno = np.array([TURNOS.index(materias[m]["turno"]) if m in materias else -1
+                                   for m in mats], dtype=np.int64)
+
+        self.disp = disp
+        self.reservas = reservas
+        self._tabla_disp()
+        self._tabla_reservas()
+
+        self.cod = {}
+        self.genes = []
+
+    def _tabla_disp(self):
+        B = self.B
+        ok = np.zeros((len(self.di), len(DIAS), 2, B, B), dtype=bool)
+        for (doc, dia, turno), rangos in self.disp.items():
+            if doc not in self.di or dia not in DIAS or turno not in TURNOS:
+                continue
+            for (db1, db2) in rangos:
+                for b1 in range(max(db1, 0), min(db2, B - 1) + 1):
+                    ok[self.di[doc], DIAS.index(dia), TURNOS.index(turno), b1, b1:min(db2, B - 1) + 1] = True
+        self.ok_disp = ok
+
+    def _tabla_reservas(self):
+        """Reservas por bucket (grupo, día, turno), rellenas con centinelas."""
+        nb = len(self.gi) * len(DIAS) * 2
+        rmax = max((len(v) for v in self.reservas.values()), default=0)
+        res = np.zeros((nb, max(rmax, 1), 3), dtype=np.int64)
+        res[:, :, 0] = 10**6            # rb1 imposible: nunca traslapa
+        res[:, :, 2] = -1
+        for (g, dia, turno), lst in self.reservas.items():
+            if g not in self.gi or dia not in DIAS or turno not in TURNOS:
+                continue
+            b = self._bucket(self.gi[g], DIAS.index(dia), TURNOS.index(turno))
+            for i, (rb1, rb2, rmat) in enumerate(lst):
+                res[b, i] = (rb1, rb2, self.mi.get(rmat, -2))
+        self.res = res if rmax else None
+
+    @staticmethod
+    def _bucket(g, dia, tu):
+        return (g * len(DIAS) + dia) * 2 + tu
+
+    def _indice(self, tabla, clave):
+        if clave not in tabla:
+            tabla[clave] = len(tabla)
+        return tabla[clave]
+
+    @staticmethod
+    def _rangos(tabla):
+        """Posición de cada índice de `tabla` (id -> índice) en el orden de los ids."""
+        r = np.empty(len(tabla), dtype=np.int64)
+        for pos, k in enumerate(sorted(tabla)):
+            r[tabla[k]] = pos
+        return r
+
+    def codificar(self, pobl):
+        """Población -> arreglo (tam, genes, campos). Cada gen distinto se
+        traduce a índices una sola vez."""
+        cod = self.cod
+        ids = []
+        for ind in pobl:
+            for x in ind:
+                i = cod.get(x)
+                if i is None:
+                    g, dia, turno, b1, b2, mat, doc = x
+                    i = cod[x] = len(self.genes)
+                    self.genes.append((
+                        self._indice(self.gi, g), DIAS.index(dia), TURNOS.index(turno),
+                        b1, b2, self._indice(self.mi, mat), self._indice(self.di, doc),
+                        self._indice(self.gm, (g, mat)),
+                    ))
+                    self.B = max(self.B, b2 + 2)
+                ids.append(i)
+        tabla = np.array(self.genes, dtype=np.int64)
+        return tabla[np.array(ids, dtype=np.int64)].reshape(len(pobl), -1, 8)
+
+    def _tablas_al_dia(self):
+        """Reconstruye las tablas si aparecieron índices nuevos en codificar()."""
+        if self.ok_disp.shape[0] < len(self.di) or self.ok_disp.shape[3] < self.B:
+            self._tabla_disp()
+        if self.res is not None and self.res.shape[0] < len(self.gi) * len(DIAS) * 2:
+            self._tabla_reservas()
+        if len(self.mat_turno) < len(self.mi):
+            extra = np.full(len(self.mi) - len(self.mat_turno), -1, dtype=np.int64)
+            self.mat_turno = np.concatenate([self.mat_turno, extra])
+
+    def _traslapes(self, bucket, b1, b2):
+        """Pares que se traslapan dentro de cada bucket, por individuo.
+
+        Con los intervalos de un bucket ordenados por inicio, el intervalo i se
+        traslapa con cada j > i cuyo inicio sea <= fin de i; ese conteo es una
+        búsqueda binaria sobre la clave (bucket, inicio) aplanada.
+        """
+        P, N = bucket.shape
+        B = self.B
+        clave = bucket * B + b1
+        orden = np.argsort(clave, axis=1, kind="stable")
+        clave = np.take_along_axis(clave, orden, axis=1)
+        fin = np.take_along_axis(bucket * B + b2, orden, axis=1)
+        offset = (np.arange(P, dtype=np.int64) * (int(bucket.max()) + 1) * B)[:, None]
+        plano = (clave + offset).ravel()
+        pos = np.searchsorted(plano, (fin + offset).ravel(), side="right").reshape(P, N)
+        propios = np.arange(N, dtype=np.int64)[None, :] + np.arange(P, dtype=np.int64)[:, None] * N
+        return (pos - propios - 1).sum(axis=1)
+
+    def evaluar(self, pobl):
+        """Devuelve (fitness, métricas, choques_grupo, pen_horas) por individuo.
+
+        `métricas` tiene una columna por clave de METRICAS, en el mismo orden.
+        """
+        X = self.codificar(pobl)
+        self._tablas_al_dia()
+        P, N, _ = X.shape
+        g, dia, tu, b1, b2, mat, doc, gm = (X[:, :, k] for k in range(8))
+        dur = b2 - b1 + 1
+        filas = np.arange(P, dtype=np.int64)[:, None]
+        m = np.zeros((P, len(METRICAS)), dtype=np.int64)
+
+        bg = self._bucket(g, dia, tu)
+        bd = self._bucket(doc, dia, tu)
+
+        # choques de docente (contra los demás genes y los fijos) y de grupo
+        if len(self.f_bd):
+            rep = lambda a: np.broadcast_to(a, (P, len(a)))
+            m[:, 0] = self._traslapes(np.hstack([bd, rep(self.f_bd)]), np.hstack([b1, rep(self.f_b1)]),
+                                      np.hstack([b2, rep(self.f_b2)]))
+        else:
+            m[:, 0] = self._traslapes(bd, b1, b2)
+        choques_grupo = self._traslapes(bg, b1, b2)
+
+        # reservas invadidas por otra materia
+        if self.res is not None:
+            r = self.res[bg]                                # (P, N, R, 3)
+            invade = ~((b2[..., None] < r[..., 0]) | (b1[..., None] > r[..., 1]))
+            invade &= r[..., 2] != mat[..., None]
+            m[:, 1] = invade.sum(axis=(1, 2))
+
+        # disponibilidad y turno
+        ok = self.ok_disp[doc, dia, tu, np.clip(b1, 0, self.B - 1), np.clip(b2, 0, self.B - 1)]
+        ok &= (b1 >= 0) & (b2 < self.B)
+        m[:, 2] = (~ok).sum(axis=1)
+        m[:, 3] = (self.mat_turno[mat] != tu).sum(axis=1)
+
+        # sesiones por (grupo, materia) contra el plan
+        K = len(self.gm)
+        cnt = np.bincount((filas * K + gm).ravel(), minlength=P * K).reshape(P, K)
+        diff = cnt[:, self.plan_gm] - self.plan_ses[None, :]
+        m[:, 4] = np.clip(diff, 0, None).sum(axis=1)
+        m[:, 5] = np.clip(-diff, 0, None).sum(axis=1)
+
+        # bloques por día de cada (grupo, materia)
+        nd = len(DIAS)
+        tot = np.bincount((filas * (K * nd) + gm * nd + dia).ravel(),
+                          weights=dur.ravel(), minlength=P * K * nd).reshape(P, K * nd)
+        m[:, 6] = np.clip(tot - 2, 0, None).sum(axis=1).astype(np.int64)
+
+        # bloques consecutivos: vecinos en el orden de (b1, b2, mat, doc) por bucket,
+        # con materia y docente ordenados por id
+        M, D, B = len(self.mi), len(self.di), self.B
+        clave = (((bg * B + b1) * B + b2) * M + self._rangos(self.mi)[mat]) * D + self._rangos(self.di)[doc]
+        orden = np.argsort(clave, axis=1, kind="stable")
+        s_bg, s_b1, s_b2, s_mat = (np.take_along_axis(a, orden, axis=1) for a in (bg, b1, b2, mat))
+        pega = ((s_bg[:, 1:] == s_bg[:, :-1]) & (s_mat[:, 1:] == s_mat[:, :-1])
+                & (s_b1[:, 1:] == s_b2[:, :-1] + 1))
+        bc = (s_b2[:, :-1] - s_b1[:, :-1] + 1) + (s_b2[:, 1:] - s_b1[:, 1:] + 1)
+        m[:, 7] = np.where(pega, np.clip(bc - 2, 0, None), 0).sum(axis=1)
+
+        # horas semanales por docente
+        bloques = np.bincount((filas * D + doc).ravel(), weights=dur.ravel(),
+                              minlength=P * D).reshape(P, D)
+        bloques += np.bincount(self.f_doc, weights=self.f_b2 - self.f_b1 + 1, minlength=D)[None, :D]
+        horas = bloques * 0.83
+        excede = horas > 35
+        m[:, 8] = excede.sum(axis=1)
+        pen_horas = np.where(excede, np.trunc((horas - 35) * 10), 0).sum(axis=1).astype(np.int64)
+
+        pen = (m[:, 0] * 6 + m[:, 1] * 10 + m[:, 2] * 8 + m[:, 3] * 4
+               + (m[:, 4] + m[:, 5]) * 3 + m[:, 6] * 7 + m[:, 7] * 5
+               + choques_grupo * 5 + pen_horas)
+        return -pen, m, choques_grupo, pen_horas
+
+    def _por_largo(self, pobl, campo):
+        """Evalúa en lotes de individuos con el mismo número de genes."""
+        out = [None] * len(pobl)
+        lotes = {}
+        for i, ind in enumerate(pobl):
+            lotes.setdefault(len(ind), []).append(i)
+        for n, idx in lotes.items():
+            if n == 0:
+                for i in idx:
+                    out[i] = None
+                continue
+            res = self.evaluar([pobl[i] for i in idx])[campo]
+            for i, v in zip(idx, res):
+                out[i] = v
+        return out
+
+    def fitness(self, pobl):
+        return [int(x) if x is not None else 0 for x in self._por_largo(pobl, 0)]
+
+    def metricas(self, pobl):
+        return [dict(zip(METRICAS, (int(v) for v in fila) if fila is not None else [0] * len(METRICAS)))
+                for fila in self._por_largo(pobl, 1)]
@@ -1,243 +1,390 @@
-import random, time
-from collections import defaultdict
-from .models import (
-    db, Turno, DIAS, Docente, Materia, Grupo,
-    MateriaGrupo, DocenteMateria, Disponibilidad,
-    ReservaModulo, Horario
-)
+import heapq, random, time
+from collections import defaultdict, OrderedDict
+from contextlib import contextmanager
+from .models import Turno, DIAS, Horario
+from . import problema, versiones
 
 GA_LOG = []
+
+class Cancelado(Exception):
+    """La corrida se detuvo porque `cancelar()` devolvió True."""
+
 def get_ga_log():
     return GA_LOG[:]
 
+# Cronometraje por fase. FASES es el de la corrida en curso (o el de la isla,
+# dentro de un proceso de paralelo.py); sin él _fase y _contar no hacen nada.
+FASE_NOMBRES = ("carga", "init", "evaluacion", "operadores", "orden", "metricas", "local", "guardado")
+FASES = None
+
+class Fases:
+    """Segundos por fase y evaluaciones de fitness, acumulados en toda la
+    corrida y en la generación en curso."""
+    def __init__(self):
+        self.total, self.gen = defaultdict(float), defaultdict(float)
+        self.evals = self.evals_gen = 0
+
+    def sumar(self, fase, seg):
+        self.total[fase] += seg
+        self.gen[fase] += seg
+
+    def contar(self, n=1):
+        self.evals += n
+        self.evals_gen += n
+
+    def corte(self):
+        """Tiempos y evaluaciones desde el corte anterior, para GA_LOG."""
+        out = {"fases": {k: round(v, 4) for k, v in self.gen.items()}, "evaluaciones": self.evals_gen}
+        self.gen, self.evals_gen = defaultdict(float), 0
+        return out
+
+    def resumen(self):
+        return {"fases": {k: round(self.total.get(k, 0.0), 4) for k in FASE_NOMBRES},
+                "evaluaciones": self.evals}
+
+@contextmanager
+def _fase(nombre):
+    if FASES is None:
+        yield
+        return
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        FASES.sumar(nombre, time.perf_counter() - t)
+
+def _contar(n=1):
+    if FASES is not None:
+        FASES.contar(n)
+
+def get_tiempos():
+    """Totales por fase y evaluaciones de la última corrida."""
+    return FASES.resumen() if FASES else None
+
 def _bloques_turno(turno: Turno):
     return list(range(1, 9))
 
-def _reservas_map():
-    R = defaultdict(list)
-    for r in ReservaModulo.query.all():
-        R[(r.grupo_id, r.dia, r.turno.value)].append((r.bloque_inicio, r.bloque_fin, r.materia_id))
-    return R
-
-def _disp_docente_map():
-    D = defaultdict(list)
-    for d in Disponibilidad.query.all():
-        D[(d.docente_id, d.dia, d.turno.value)].append((d.bloque_inicio, d.bloque_fin))
-    return D
-
-def _materias_por_docente():
-    M = defaultdict(set)
-    for dm in DocenteMateria.query.all():
-        M[dm.docente_id].add(dm.materia_id)
+# Máscaras de bits. Un rango de bloques [b1, b2] es _mask_bloques(b1, b2)
+# (bit b por bloque b) y también un solo bit _bit_rango(b1, b2) en un mapa de
+# rangos: la disponibilidad guarda qué rangos caben completos en algún
+# intervalo del docente, igual que el any(...) sobre la lista.
+def _mask_bloques(b1, b2):
+    return ((1 << (b2 - b1 + 1)) - 1) << b1
+
+def _bit_rango(b1, b2):
+    return 1 << (b1 * 16 + b2)
+
+def _disp_mask(D):
+    """(docente, día, turno) -> bits de los rangos [b1, b2] disponibles."""
+    M = {}
+    for key, rangos in D.items():
+        mask = 0
+        for (db1, db2) in rangos:
+            for b1 in range(db1, db2 + 1):
+                for b2 in range(b1, db2 + 1):
+                    mask |= _bit_rango(b1, b2)
+        M[key] = mask
     return M
 
-def _planes():
-    P = []
-    for p in MateriaGrupo.query.all():
-        m = Materia.query.get(p.materia_id)
-        g = Grupo.query.get(p.grupo_id)
-        P.append((g.id, m.id, p.sesiones_por_semana, m.bloques_duracion, g.turno.value))
-    return P
+def _reservas_mask(R, materias):
+    """(grupo, día, turno, materia) -> bloques reservados para otra materia."""
+    M = {}
+    for (g, dia, turno), lst in R.items():
+        for mat in materias:
+            mask = 0
+            for (rb1, rb2, rmat) in lst:
+                if rmat != mat:
+                    mask |= _mask_bloques(rb1, rb2)
+            if mask:
+                M[(g, dia, turno, mat)] = mask
+    return M
 
-def _docentes():
-    return Docente.query.all()
+def _fijos(grupos):
+    """Genes del horario activo de los grupos fuera del alcance."""
+    if grupos is None:
+        return []
+    return [(h.grupo_id, h.dia, h.turno.value, h.bloque_inicio, h.bloque_fin, h.materia_id, h.docente_id)
+            for h in versiones.filas().filter(~Horario.grupo_id.in_(grupos))]
 
-def _fitness(ind):
-    pen = 0
-    by_g_dia = defaultdict(list)
-    by_d_doc = defaultdict(list)
-    by_g_m_d = defaultdict(list)
-    by_docente = defaultdict(int)
+METRICAS = [
+    "conflictos_docente", "violacion_reserva", "violacion_disponibilidad",
+    "turno_incorrecto", "exceso_sesiones", "falta_sesiones",
+    "exceso_bloques_dia", "exceso_bloques_consecutivos", "exceso_horas_semanales",
+]
 
-    for (g,dia,turno,b1,b2,mat,doc) in ind:
-        by_g_dia[(g,dia,turno)].append((b1,b2,mat,doc))
-        by_d_doc[(doc,dia,turno)].append((b1,b2,mat,g))
-        by_g_m_d[(g,mat,dia)].append((b1,b2))
-        by_docente[doc] += (b2 - b1 + 1)
-
-    for key, slots in by_g_dia.items():
-        slots.sort()
-        g,dia,turno = key
+def _traslapes(slots):
+    """Pares de slots que se traslapan, con `slots` ordenado por inicio: cada
+    slot choca con los anteriores que aún no terminan (heap de fines)."""
+    n = 0
+    fines = []
+    for s in slots:
+        while fines and fines[0] < s[0]:
+            heapq.heappop(fines)
+        n += len(fines)
+        heapq.heappush(fines, s[1])
+    return n
+
+# Penalización que aporta cada bucket. _fitness suma todas; la evaluación
+# incremental solo recalcula las de los buckets que tocan los genes cambiados.
+# Si se pasa `m`, además se acumula ahí el desglose por restricción.
+# Cada bucket se ordena una sola vez y traslapes, reservas y consecutivos se
+# cuentan sobre esa misma lista.
+def _pen_g_dia(key, slots, m=None):
+    slots = sorted(slots)
+    reservas = consecutivos = 0
+    if key in RESERVAS:
         for (b1,b2,mat,doc) in slots:
-            for (rb1,rb2,rmat) in RESERVAS.get((g,dia,turno), []):
+            # la máscara descarta de inmediato los slots que no tocan reservas
+            if not RES_MASK.get(key + (mat,), 0) & _mask_bloques(b1, b2):
+                continue
+            for (rb1,rb2,rmat) in RESERVAS[key]:
                 if not (b2 < rb1 or b1 > rb2) and rmat != mat:
-                    pen += 10
-        for i in range(len(slots)):
-            b1,b2,_,_ = slots[i]
-            for j in range(i+1,len(slots)):
-                c1,c2,_,_ = slots[j]
-                if not (b2 < c1 or b1 > c2):
-                    pen += 5
-
-    for key, slots in by_d_doc.items():
-        slots.sort()
-        for i in range(len(slots)):
-            b1,b2,_,_ = slots[i]
-            for j in range(i+1,len(slots)):
-                c1,c2,_,_ = slots[j]
-                if not (b2 < c1 or b1 > c2):
-                    pen += 6
+                    reservas += 1
+    for i in range(len(slots) - 1):
+        _, b2_actual, mat_actual, _ = slots[i]
+        b1_siguiente, _, mat_siguiente, _ = slots[i+1]
+        if mat_actual == mat_siguiente and b1_siguiente == b2_actual + 1:
+            bloques_consecutivos = b2_actual - slots[i][0] + 1 + (slots[i+1][1] - b1_siguiente + 1)
+            if bloques_consecutivos > 2:
+                consecutivos += bloques_consecutivos - 2
+    if m is not None:
+        m["violacion_reserva"] += reservas
+        m["exceso_bloques_consecutivos"] += consecutivos
+    return reservas * 10 + _traslapes(slots) * 5 + consecutivos * 5
 
-    for (g,dia,turno,b1,b2,mat,doc) in ind:
-        ok = any(b1 >= db1 and b2 <= db2 for (db1,db2) in DISP.get((doc,dia,turno), []))
-        if not ok:
-            pen += 8
-        if MATERIAS[mat]["turno"] != turno:
-            pen += 4
-
-    count = defaultdict(int)
-    for (g,_,_,_,_,mat,_) in ind:
-        count[(g,mat)] += 1
-    for (g,mat,ses,dur,turno) in PLANES:
-        if count[(g,mat)] > ses:
-            pen += (count[(g,mat)] - ses) * 3
-        elif count[(g,mat)] < ses:
-            pen += (ses - count[(g,mat)]) * 3
-
-    for key, lst in by_g_m_d.items():
-        total_blocks = sum((b2-b1+1) for (b1,b2) in lst)
-        exceso = max(0, total_blocks - 2)
-        if exceso > 0:
-            pen += exceso * 7
-
-    for key, slots in by_g_dia.items():
-        slots.sort()
-        for i in range(len(slots) - 1):
-            _, b2_actual, mat_actual, _ = slots[i]
-            b1_siguiente, _, mat_siguiente, _ = slots[i+1]
-            if mat_actual == mat_siguiente and b1_siguiente == b2_actual + 1:
-                bloques_consecutivos = b2_actual - slots[i][0] + 1 + (slots[i+1][1] - b1_siguiente + 1)
-                if bloques_consecutivos > 2:
-                    pen += (bloques_consecutivos - 2) * 5
-
-    for doc, total_bloques in by_docente.items():
-        horas = total_bloques * 0.83
-        if horas > 35:
-            pen += int((horas - 35) * 10)
+def _pen_d_doc(key, slots, m=None):
+    n = _traslapes(sorted(slots))
+    if m is not None:
+        m["conflictos_docente"] += n
+    return n * 6
 
-    return -pen
+def _pen_g_m_d(key, lst, m=None):
+    total_blocks = sum((b2-b1+1) for (b1,b2) in lst)
+    exceso = max(0, total_blocks - 2)
+    if m is not None:
+        m["exceso_bloques_dia"] += exceso
+    return exceso * 7
 
-def _metrics(ind):
-    m = {
-        "conflictos_docente": 0,
-        "violacion_reserva": 0,
-        "violacion_disponibilidad": 0,
-        "turno_incorrecto": 0,
-        "exceso_sesiones": 0,
-        "falta_sesiones": 0,
-        "exceso_bloques_dia": 0,
-        "exceso_bloques_consecutivos": 0,
-        "exceso_horas_semanales": 0,
+def _pen_gen(gen, m=None):
+    g,dia,turno,b1,b2,mat,doc = gen
+    pen = 0
+    if not DISP_MASK.get((doc,dia,turno), 0) & _bit_rango(b1, b2):
+        pen += 8
+        if m is not None:
+            m["violacion_disponibilidad"] += 1
+    if MATERIAS[mat]["turno"] != turno:
+        pen += 4
+        if m is not None:
+            m["turno_incorrecto"] += 1
+    return pen
+
+def _pen_sesiones(key, n, m=None):
+    pen = 0
+    for ses in PLAN_SES.get(key, ()):
+        pen += abs(n - ses) * 3
+        if m is not None:
+            m["exceso_sesiones" if n > ses else "falta_sesiones"] += abs(n - ses)
+    return pen
+
+def _pen_horas(doc, total_bloques, m=None):
+    horas = total_bloques * 0.83
+    if horas <= 35:
+        return 0
+    if m is not None:
+        m["exceso_horas_semanales"] += 1
+    return int((horas - 35) * 10)
+
+def _buckets(genes):
+    """Reparte genes en buckets: (clave, slot) por cada tipo de bucket."""
+    for (g,dia,turno,b1,b2,mat,doc) in genes:
+        yield (
+            ((g,dia,turno), (b1,b2,mat,doc)),
+            ((doc,dia,turno), (b1,b2,mat,g)),
+            ((g,mat,dia), (b1,b2)),
+        )
+
+_PEN_BUCKET = (_pen_g_dia, _pen_d_doc, _pen_g_m_d)
+
+def _estado_fitness(ind, m=None):
+    """Buckets y penalización por bucket de `ind`, base de _fitness_delta."""
+    est = {
+        "buckets": (defaultdict(list), defaultdict(list), defaultdict(list)),
+        "pen_bucket": ({}, {}, {}),
+        "horas": defaultdict(int),
+        "ses": defaultdict(int),
     }
+    for trio in _buckets(ind):
+        for bk, (key, slot) in zip(est["buckets"], trio):
+            bk[key].append(slot)
+    # filas fijas del otro turno: ocupan al docente pero no se optimizan
+    for (g,dia,turno,b1,b2,mat,doc) in FIJOS:
+        est["buckets"][1][(doc,dia,turno)].append((b1,b2,mat,g))
+        est["horas"][doc] += (b2 - b1 + 1)
+    pen = 0
+    for bk, pens, fn in zip(est["buckets"], est["pen_bucket"], _PEN_BUCKET):
+        for key, slots in bk.items():
+            pens[key] = fn(key, slots, m)
+            pen += pens[key]
 
-    by_g_dia = defaultdict(list)
-    by_d_doc = defaultdict(list)
-    by_g_m_d = defaultdict(list)
-    by_docente = defaultdict(int)
+    for gen in ind:
+        g,dia,turno,b1,b2,mat,doc = gen
+        pen += _pen_gen(gen, m)
+        est["horas"][doc] += (b2 - b1 + 1)
+        est["ses"][(g,mat)] += 1
+    for key in PLAN_SES:
+        pen += _pen_sesiones(key, est["ses"].get(key, 0), m)
+    for doc, total_bloques in est["horas"].items():
+        pen += _pen_horas(doc, total_bloques, m)
+    est["pen"] = pen
+    return est
 
-    for (g,dia,turno,b1,b2,mat,doc) in ind:
-        by_g_dia[(g,dia,turno)].append((b1,b2,mat,doc))
-        by_d_doc[(doc,dia,turno)].append((b1,b2,mat,g))
-        by_g_m_d[(g,mat,dia)].append((b1,b2))
-        by_docente[doc] += (b2 - b1 + 1)
-
-    for key, slots in by_g_dia.items():
-        slots.sort()
-        g,dia,turno = key
-        for (b1,b2,mat,doc) in slots:
-            for (rb1,rb2,rmat) in RESERVAS.get((g,dia,turno), []):
-                if not (b2 < rb1 or b1 > rb2) and rmat != mat:
-                    m["violacion_reserva"] += 1
+def _evaluar(ind):
+    """Fitness y desglose por restricción de `ind` en una sola pasada."""
+    m = dict.fromkeys(METRICAS, 0)
+    return -_estado_fitness(ind, m)["pen"], m
 
-    for key, slots in by_d_doc.items():
-        slots.sort()
-        for i in range(len(slots)):
-            b1,b2,_,_ = slots[i]
-            for j in range(i+1,len(slots)):
-                c1,c2,_,_ = slots[j]
-                if not (b2 < c1 or b1 > c2):
-                    m["conflictos_docente"] += 1
+def _fitness(ind):
+    return -_estado_fitness(ind)["pen"]
 
-    for (g,dia,turno,b1,b2,mat,doc) in ind:
-        ok = any(b1 >= db1 and b2 <= db2 for (db1,db2) in DISP.get((doc,dia,turno), []))
-        if not ok:
-            m["violacion_disponibilidad"] += 1
-        if MATERIAS[mat]["turno"] != turno:
-            m["turno_incorrecto"] += 1
+def _metrics(ind):
+    return _evaluar(ind)[1]
 
-    count = defaultdict(int)
-    for (g,_,_,_,_,mat,_) in ind:
-        count[(g,mat)] += 1
-    for (g,mat,ses,dur,turno) in PLANES:
-        if count[(g,mat)] > ses:
-            m["exceso_sesiones"] += (count[(g,mat)] - ses)
-        elif count[(g,mat)] < ses:
-            m["falta_sesiones"] += (ses - count[(g,mat)])
-
-    for key, lst in by_g_m_d.items():
-        total_blocks = sum((b2-b1+1) for (b1,b2) in lst)
-        exceso = max(0, total_blocks - 2)
-        m["exceso_bloques_dia"] += exceso
+def _fitness_delta(est, quitar, poner, aplicar=False):
+    """Fitness del individuo que resulta de cambiar los genes `quitar` por
+    `poner` en el individuo descrito por `est`. Con `aplicar` el cambio se
+    escribe en `est`; si no, `est` no se modifica."""
+    pen = est["pen"]
+    tocados = ({}, {}, {})
+    for genes, agregar in ((quitar, False), (poner, True)):
+        for trio in _buckets(genes):
+            for bk, nuevos, (key, slot) in zip(est["buckets"], tocados, trio):
+                if key not in nuevos:
+                    nuevos[key] = list(bk.get(key, ()))
+                if agregar:
+                    nuevos[key].append(slot)
+                else:
+                    nuevos[key].remove(slot)
+    for bk, nuevos, pens, fn in zip(est["buckets"], tocados, est["pen_bucket"], _PEN_BUCKET):
+        for key, slots in nuevos.items():
+            p = fn(key, slots)
+            pen += p - pens.get(key, 0)
+            if aplicar:
+                bk[key] = slots; pens[key] = p
 
-    for key, slots in by_g_dia.items():
-        slots.sort()
-        for i in range(len(slots) - 1):
-            _, b2_actual, mat_actual, _ = slots[i]
-            b1_siguiente, _, mat_siguiente, _ = slots[i+1]
-            if mat_actual == mat_siguiente and b1_siguiente == b2_actual + 1:
-                bloques_consecutivos = b2_actual - slots[i][0] + 1 + (slots[i+1][1] - b1_siguiente + 1)
-                if bloques_consecutivos > 2:
-                    m["exceso_bloques_consecutivos"] += (bloques_consecutivos - 2)
-
-    for doc, total_bloques in by_docente.items():
-        horas = total_bloques * 0.83
-        if horas > 35:
-            m["exceso_horas_semanales"] += 1
-
-    return m
-
-def _random_individuo():
-    IND = []
-    demandas = []
-    for (g,mat,ses,dur,turno) in PLANES:
-        for _ in range(ses):
-            demandas.append((g,mat,dur,turno))
-    random.shuffle(demandas)
-
-    for (g,mat,dur,turno) in demandas:
-        dias = DIAS[:]; random.shuffle(dias)
-        posibles_docs = [d.id for d in DOCENTES if mat in MATXDOC[d.id]]
-        random.shuffle(posibles_docs)
-        placed = False
-
-        for dia in dias:
-            starts = [b for b in _bloques_turno(Turno[turno]) if b+dur-1 <= 8]
-            random.shuffle(starts)
-            for b1 in starts:
-                b2 = b1 + dur - 1
-                bad = False
-                for (rb1,rb2, rmat) in RESERVAS.get((g,dia,turno), []):
-                    if not (b2 < rb1 or b1 > rb2) and rmat != mat:
-                        bad = True; break
-                if bad: continue
-
-                for doc in posibles_docs:
-                    okd = any(b1 >= db1 and b2 <= db2 for (db1,db2) in DISP.get((doc,dia,turno), []))
-                    if not okd: continue
-
-                    total_blocks = sum((x[4]-x[3]+1) for x in IND if x[0]==g and x[1]==dia and x[5]==mat)
-                    if total_blocks + dur > 2:
-                        continue
-
-                    IND.append((g,dia,turno,b1,b2,mat,doc))
-                    placed = True
-                    break
-                if placed: break
-            if placed: break
-
-        if not placed:
-            doc = (posibles_docs[0] if posibles_docs else random.choice([d.id for d in DOCENTES]))
-            IND.append((g, random.choice(DIAS), turno, 1, dur, mat, doc))
+    horas, ses = {}, {}
+    for genes, signo in ((quitar, -1), (poner, 1)):
+        for gen in genes:
+            g,dia,turno,b1,b2,mat,doc = gen
+            pen += signo * _pen_gen(gen)
+            horas[doc] = horas.get(doc, 0) + signo * (b2 - b1 + 1)
+            ses[(g,mat)] = ses.get((g,mat), 0) + signo
+    for doc, d in horas.items():
+        if d:
+            antes = est["horas"].get(doc, 0)
+            pen += _pen_horas(doc, antes + d) - _pen_horas(doc, antes)
+            if aplicar:
+                est["horas"][doc] = antes + d
+    for key, d in ses.items():
+        if d:
+            antes = est["ses"].get(key, 0)
+            pen += _pen_sesiones(key, antes + d) - _pen_sesiones(key, antes)
+            if aplicar:
+                est["ses"][key] = antes + d
+    if aplicar:
+        est["pen"] = pen
+    return -pen
+
+# Fracción de genes cambiados desde la que el delta sale más caro que evaluar
+# completo; la medición está en el docstring de _fitness_hijo.
+DELTA_MAX = 0.4
+
+def _estado(ind, estados):
+    """Estado de `ind` guardado en `estados` (id -> (ind, est)); si no está, se construye."""
+    e = estados.get(id(ind))
+    if e is None or e[0] is not ind:
+        e = estados[id(ind)] = (ind, _estado_fitness(ind))
+    return e[1]
+
+def _fitness_hijo(hijo, padres, estados):
+    """Evalúa `hijo` por delta contra el padre del que menos difiere, o completo
+    si cambió más de DELTA_MAX de los genes. El estado de cada padre se
+    construye la primera vez y queda en `estados` (id -> (padre, est)) para
+    sus demás hijos; el hijo no guarda el suyo.
+
+    En la instancia de 100 grupos (1180 genes) el delta cuesta, frente a una
+    evaluación completa, 0.3 con 10% de genes cambiados, 0.5 con 20%, 0.7 con
+    30%, 0.9 con 40% y 1.1 con 50%."""
+    mejor = None
+    for p in padres:
+        if len(p) != len(hijo):
+            continue
+        quitar = [a for a, b in zip(p, hijo) if a != b]
+        if mejor is None or len(quitar) < len(mejor[1]):
+            mejor = (p, quitar)
+    if mejor is None or len(mejor[1]) > DELTA_MAX * len(hijo):
+        return _fitness(hijo)
+    p, quitar = mejor
+    est = _estado(p, estados)
+    if not quitar:
+        return -est["pen"]
+    return _fitness_delta(est, quitar, [b for a, b in zip(p, hijo) if a != b])
+
+def _colocar(g, mat, dur, turno, rng, ocup_g, ocup_d, bloques, estricto):
+    """Primer hueco (en orden aleatorio) para una sesión: respeta reservas,
+    disponibilidad y máximo 2 bloques por día; con `estricto` además evita
+    choques con el grupo y con el docente según las ocupaciones en bits."""
+    dias = DIAS[:]; rng.shuffle(dias)
+    docs = list(DOCS_X_MAT.get(mat, ())); rng.shuffle(docs)
+    for dia in dias:
+        if bloques[(g,mat,dia)] + dur > 2:
+            continue
+        starts = [b for b in _bloques_turno(Turno[turno]) if b+dur-1 <= 8]
+        rng.shuffle(starts)
+        for b1 in starts:
+            b2 = b1 + dur - 1
+            mask = _mask_bloques(b1, b2)
+            if RES_MASK.get((g,dia,turno,mat), 0) & mask:
+                continue
+            if estricto and ocup_g[(g,dia,turno)] & mask:
+                continue
+            rango = _bit_rango(b1, b2)
+            for doc in docs:
+                if not DISP_MASK.get((doc,dia,turno), 0) & rango:
+                    continue
+                if estricto and ocup_d[(doc,dia,turno)] & mask:
+                    continue
+                return (g,dia,turno,b1,b2,mat,doc)
+    return None
+
+def _random_individuo(rng=random, orden="aleatorio"):
+    """Individuo constructivo. Las sesiones se colocan en orden aleatorio o,
+    con orden="restringido", primero las de menos huecos factibles (HOLGURA).
+    Las ocupaciones de grupo y docente se llevan en bits por (clave, día, turno)
+    para que cada prueba sea O(1).
+
+    Sea cual sea el orden de colocación, el gen i es siempre la sesión
+    DEMANDAS[i]: así todos los individuos quedan alineados para el cruce."""
+    IND = [None] * len(DEMANDAS)
+    demandas = list(enumerate(DEMANDAS))
+    rng.shuffle(demandas)
+    if orden == "restringido":
+        demandas.sort(key=lambda d: HOLGURA[(d[1][0], d[1][1])])
+    ocup_g, ocup_d, bloques = defaultdict(int), defaultdict(int), defaultdict(int)
+    for (g,dia,turno,b1,b2,mat,doc) in FIJOS:
+        ocup_d[(doc,dia,turno)] |= _mask_bloques(b1, b2)
+
+    for i, (g,mat,dur,turno) in demandas:
+        gen = (_colocar(g, mat, dur, turno, rng, ocup_g, ocup_d, bloques, True)
+               or _colocar(g, mat, dur, turno, rng, ocup_g, ocup_d, bloques, False))
+        if gen is None:
+            docs = DOCS_X_MAT.get(mat)
+            doc = rng.choice(docs) if docs else rng.choice(DOCENTES)
+            gen = (g, rng.choice(DIAS), turno, 1, dur, mat, doc)
+        _, dia, _, b1, b2, _, doc = gen
+        ocup_g[(g,dia,turno)] |= _mask_bloques(b1, b2)
+        ocup_d[(doc,dia,turno)] |= _mask_bloques(b1, b2)
+        bloques[(g,mat,dia)] += b2 - b1 + 1
+        IND[i] = gen
     return IND
 
 def _crossover(a, b, rate=0.5):
@@ -245,6 +392,28 @@ def _crossover(a, b, rate=0.5):
     cut = int(n * rate)
     return a[:cut] + b[cut:]
 
+# Cruces sobre individuos alineados (gen i = DEMANDAS[i]): cada posición del
+# hijo viene de la misma posición de uno de los padres, así que ninguna sesión
+# se duplica ni se pierde.
+def _cruce_un_punto(a, b):
+    return _crossover(a, b, rate=random.uniform(0.3, 0.7))
+
+def _cruce_grupos(a, b):
+    """Cada grupo hereda completo el horario de uno de los dos padres."""
+    de_a = {}
+    hijo = []
+    for i in range(min(len(a), len(b))):
+        g = a[i][0]
+        if g not in de_a:
+            de_a[g] = random.random() < 0.5
+        hijo.append(a[i] if de_a[g] else b[i])
+    return hijo
+
+def _cruce_uniforme(a, b):
+    return [x if random.random() < 0.5 else y for x, y in zip(a, b)]
+
+CRUCES = {"un_punto": _cruce_un_punto, "grupos": _cruce_grupos, "uniforme": _cruce_uniforme}
+
 def _mutate(ind, pm=0.15):
     out = []
     for (g,dia,turno,b1,b2,mat,doc) in ind:
@@ -257,49 +426,478 @@ def _mutate(ind, pm=0.15):
                 starts = [x for x in range(1,9) if x+dur-1 <= 8]
                 b1 = random.choice(starts); b2 = b1 + dur - 1
             else:
-                posibles = [d for d in DOCENTES if mat in MATXDOC[d.id]]
+                posibles = DOCS_X_MAT.get(mat)
                 if posibles:
-                    doc = random.choice(posibles).id
+                    doc = random.choice(posibles)
         out.append((g,dia,turno,b1,b2,mat,doc))
     return out
 
-def _to_horario(ind):
-    Horario.query.delete()
-    for (g,dia,turno,b1,b2,mat,doc) in ind:
-        h = Horario(
-            grupo_id=g, materia_id=mat, docente_id=doc, dia=dia,
-            turno=Turno[turno], bloque_inicio=b1, bloque_fin=b2
-        )
-        db.session.add(h)
-    db.session.commit()
+# Búsqueda local (paso memético). Cada movimiento es (índices, genes nuevos)
+# y se evalúa con _fitness_delta sin reconstruir el individuo.
+def _mov_bloque(ind, i, rng):
+    g,dia,turno,b1,b2,mat,doc = ind[i]
+    dur = b2 - b1 + 1
+    b1 = rng.randint(1, 9 - dur)
+    return [i], [(g,dia,turno,b1,b1+dur-1,mat,doc)]
+
+def _mov_dia(ind, i, rng):
+    g,dia,turno,b1,b2,mat,doc = ind[i]
+    return [i], [(g,rng.choice(DIAS),turno,b1,b2,mat,doc)]
+
+def _mov_docente(ind, i, rng):
+    g,dia,turno,b1,b2,mat,doc = ind[i]
+    docs = DOCS_X_MAT.get(mat)
+    if not docs:
+        return None
+    return [i], [(g,dia,turno,b1,b2,mat,rng.choice(docs))]
+
+def _mov_intercambio(ind, i, rng, por_grupo):
+    """Dos sesiones del mismo grupo intercambian día y bloque de inicio."""
+    j = rng.choice(por_grupo[ind[i][0]])
+    if j == i:
+        return None
+    g,dia,turno,b1,b2,mat,doc = ind[i]
+    _,dia2,turno2,c1,c2,mat2,doc2 = ind[j]
+    if c1 + (b2 - b1) > 8 or b1 + (c2 - c1) > 8:
+        return None
+    return [i, j], [(g,dia2,turno,c1,c1+b2-b1,mat,doc), (g,dia,turno2,b1,b1+c2-c1,mat2,doc2)]
+
+def _movimiento(ind, rng, por_grupo):
+    """Movimiento al azar sobre `ind` o None si el sorteado no aplica."""
+    i = rng.randrange(len(ind))
+    op = rng.randrange(4)
+    if op == 0:
+        return _mov_bloque(ind, i, rng)
+    if op == 1:
+        return _mov_dia(ind, i, rng)
+    if op == 2:
+        return _mov_docente(ind, i, rng)
+    return _mov_intercambio(ind, i, rng, por_grupo)
+
+def _por_grupo(ind):
+    por_grupo = defaultdict(list)
+    for i, gen in enumerate(ind):
+        por_grupo[gen[0]].append(i)
+    return por_grupo
+
+def _busqueda_local(ind, t_fin, rng=random):
+    """Ascenso de primera mejora: prueba movimientos al azar (bloque, día,
+    intercambio en el grupo, docente) y aplica el primero que mejora, hasta
+    `t_fin` o hasta 2*len(ind) intentos seguidos sin mejora.
+    Devuelve (fitness, individuo nuevo)."""
+    ind = list(ind)
+    est = _estado_fitness(ind)
+    if not ind:
+        return -est["pen"], ind
+    por_grupo = _por_grupo(ind)
+    fallos = evals = 0
+    while fallos < 2 * len(ind) and time.time() < t_fin:
+        mov = _movimiento(ind, rng, por_grupo)
+        if mov is None:
+            fallos += 1
+            continue
+        idx, poner = mov
+        quitar = [ind[k] for k in idx]
+        evals += 1
+        if _fitness_delta(est, quitar, poner) > -est["pen"]:
+            _fitness_delta(est, quitar, poner, aplicar=True)
+            for k, gen in zip(idx, poner):
+                ind[k] = gen
+            fallos = 0
+        else:
+            fallos += 1
+    _contar(evals)
+    return -est["pen"], ind
+
+def _mejorar_elite(ranked, elite, presupuesto):
+    """Aplica _busqueda_local a los `elite` mejores de `ranked`, repartiendo
+    `presupuesto` segundos entre ellos, y devuelve el ranking actualizado."""
+    n = min(elite, len(ranked))
+    por = presupuesto / max(n, 1)
+    top = [_busqueda_local(ind, time.time() + por) for _, ind in ranked[:n]]
+    return sorted(top + ranked[n:], key=lambda x: x[0], reverse=True)
+
+def _to_horario(ind, origen="ga", fitness=None):
+    """Guarda `ind` como versión nueva del horario y la activa; los grupos
+    fuera del alcance (FIJOS) pasan tal cual de la versión anterior.
+    Devuelve el id de la versión."""
+    return versiones.guardar(list(ind) + FIJOS, origen, fitness)
+
+# Datos del problema que usan fitness y operadores; se cargan una vez por
+# corrida y se copian tal cual a los procesos de paralelo.py.
+_PROBLEMA = ("RESERVAS", "DISP", "MATXDOC", "PLANES", "DOCENTES", "MATERIAS", "PLAN_SES",
+             "DISP_MASK", "RES_MASK", "DOCS_X_MAT", "DEMANDAS", "HOLGURA", "FIJOS")
+FIJOS = []
+GRUPOS = None
+
+def _cargar_problema(turnos=None):
+    """Con `turnos` solo entran los grupos de esos turnos (GRUPOS); el horario
+    vigente de los demás queda en FIJOS como ocupación de los docentes.
+
+    Las estructuras salen de la foto de problema.py y se guardan en ella por
+    alcance: mientras los datos no cambien, solo FIJOS se vuelve a leer."""
+    global FIJOS, GRUPOS
+    foto = problema.foto()
+    GRUPOS = None
+    if turnos is not None:
+        sel = {Turno(t).value for t in turnos}
+        if sel != {t.value for t in Turno}:
+            GRUPOS = {g for g, t in foto.grupos.items() if t in sel}
+    FIJOS = _fijos(GRUPOS)
+    clave = frozenset(GRUPOS) if GRUPOS is not None else None
+    if clave in foto.derivados:
+        _instalar_problema(foto.derivados[clave])
+        return
+    _derivar(foto, GRUPOS)
+    foto.derivados[clave] = {k: globals()[k] for k in _PROBLEMA if k != "FIJOS"}
+
+def _derivar(foto, grupos):
+    global RESERVAS, DISP, MATXDOC, PLANES, DOCENTES, MATERIAS, PLAN_SES, DISP_MASK, RES_MASK
+    global DOCS_X_MAT, DEMANDAS, HOLGURA
+    RESERVAS, DISP, MATXDOC, DOCENTES = foto.reservas, foto.disp, foto.matxdoc, foto.docentes
+    PLANES = [p for p in foto.planes if grupos is None or p[0] in grupos]
+    MATERIAS = {m: {"dur": dur, "turno": turno} for m, (dur, turno) in foto.materias.items()}
+    PLAN_SES = defaultdict(list)
+    for (g,mat,ses,dur,turno) in PLANES:
+        PLAN_SES[(g,mat)].append(ses)
+    DISP_MASK = _disp_mask(DISP)
+    RES_MASK = _reservas_mask(RESERVAS, MATERIAS)
+    DOCS_X_MAT = defaultdict(list)
+    for d in DOCENTES:
+        for mat in MATXDOC[d]:
+            DOCS_X_MAT[mat].append(d)
+    DEMANDAS = [(g,mat,dur,turno) for (g,mat,ses,dur,turno) in PLANES for _ in range(ses)]
+    HOLGURA = _holgura()
+
+def _holgura():
+    """(grupo, materia) -> huecos (día, bloque, docente) donde cabe una sesión
+    sin tocar reservas ajenas ni salirse de la disponibilidad. Los docentes
+    disponibles por (materia, turno, día, rango) se cuentan una sola vez."""
+    cupo = {}
+    H = {}
+    for (g,mat,ses,dur,turno) in PLANES:
+        n = 0
+        for dia in DIAS:
+            for b1 in range(1, 10 - dur):
+                if RES_MASK.get((g,dia,turno,mat), 0) & _mask_bloques(b1, b1+dur-1):
+                    continue
+                key = (mat,turno,dia,b1,dur)
+                if key not in cupo:
+                    rango = _bit_rango(b1, b1+dur-1)
+                    cupo[key] = sum(1 for d in DOCS_X_MAT.get(mat, ()) if DISP_MASK.get((d,dia,turno), 0) & rango)
+                n += cupo[key]
+        H[(g,mat)] = n
+    return H
+
+def _problema():
+    return {k: globals()[k] for k in _PROBLEMA}
+
+def _instalar_problema(datos):
+    globals().update(datos)
 
 def generar_horario(generaciones=60, tam=40, elite=6, seed=None,
-                    turnos=None, verbose=True, max_seconds=60, early_stop=12):
-    global GA_LOG, RESERVAS, DISP, MATXDOC, PLANES, DOCENTES, MATERIAS
+                    turnos=None, verbose=True, max_seconds=60, early_stop=12,
+                    incremental=True, vectorizado=False, workers=None,
+                    islas=1, migracion=5, topologia="anillo", migrantes=1,
+                    log_comp="mejora", init="restringido", cancelar=None, progreso=None,
+                    memetico=0, engine="ga", cache=256, cruce="grupos", torneo=3,
+                    adaptativo=True, reinicios=2):
+    """`workers` > 1 reparte la inicialización y la evaluación de la población
+    en un pool de procesos; el resultado para una `seed` no depende de cuántos
+    procesos se usen.
 
+    Con `islas` > 1 evolucionan `islas` poblaciones de tamaño `tam`, cada una
+    en su proceso, que cada `migracion` generaciones mandan sus `migrantes`
+    mejores a la isla siguiente (`topologia="anillo"`) o a todas ("todos").
+
+    `log_comp="mejora"` recalcula el desglose por restricción de GA_LOG solo
+    cuando cambia el mejor individuo; "siempre" lo recalcula cada generación.
+
+    `turnos` limita la corrida a los grupos de esos turnos: el horario vigente
+    de los otros grupos se respeta como ocupación de los docentes y solo se
+    reemplazan las filas de los grupos del alcance.
+
+    `init="restringido"` construye la población inicial colocando primero las
+    sesiones con menos huecos factibles; "aleatorio" las coloca en orden
+    aleatorio.
+
+    `cancelar` se consulta una vez por generación; si devuelve True la corrida
+    termina con Cancelado sin tocar el horario guardado. `progreso(entrada)`
+    recibe cada entrada de GA_LOG en cuanto se registra.
+
+    `memetico` > 0 es el presupuesto en segundos por generación de búsqueda
+    local (primera mejora) sobre los `elite` mejores; 0 la desactiva.
+
+    `engine` elige el motor: "ga" (este algoritmo genético) o uno de una sola
+    solución de motores.py, "sa" (recocido simulado) o "tabu"; estos ignoran
+    `tam`, `elite`, `workers`, `islas` y `memetico`.
+
+    `cache` es el tamaño del LRU de fitness (por población o isla) que evita
+    reevaluar individuos repetidos; 0 lo desactiva. Sus aciertos y fallos
+    acumulados van en la clave "cache" de cada entrada de GA_LOG.
+
+    `cruce` elige el operador de cruce sobre genes alineados: "grupos" (cada
+    grupo hereda de un padre), "uniforme" (cada gen) o "un_punto".
+
+    `torneo` > 0 elige cada padre como el mejor de `torneo` individuos al
+    azar; 0 lo toma al azar de los 2*`elite` mejores. Con `adaptativo` la
+    probabilidad de mutación (0.15 al inicio) sube o baja cada generación según
+    cuántos hijos entran a la élite y la diversidad de la población. Al
+    estancarse `early_stop` generaciones se hace un reinicio parcial (élite más
+    hipermutados y nuevos) hasta `reinicios` veces antes de terminar. Cada
+    decisión queda en la clave "control" de GA_LOG.
+
+    Los valores por omisión de `init`, `cruce`, `torneo`, `adaptativo` y
+    `reinicios` no son los de la versión original; para reproducirla:
+    init="aleatorio", cruce="un_punto", torneo=0, adaptativo=False,
+    reinicios=0 (el cruce original cortaba siempre a la mitad).
+
+    Cada entrada de GA_LOG lleva en "tiempos" los segundos por fase (ver
+    FASE_NOMBRES) y las evaluaciones desde la entrada anterior; los totales de
+    la corrida, con la carga y el guardado, los da get_tiempos()."""
+    global GA_LOG, FASES
     if seed is not None:
         random.seed(seed)
     t0 = time.time()
+    FASES = Fases()
+
+    with _fase("carga"):
+        _cargar_problema(turnos)
 
-    RESERVAS = _reservas_map()
-    DISP = _disp_docente_map()
-    MATXDOC = _materias_por_docente()
-    PLANES = _planes()
-    DOCENTES = _docentes()
-    MATERIAS = {m.id: {"dur": m.bloques_duracion, "turno": m.turno.value} for m in Materia.query.all()}
+    if engine != "ga":
+        from .motores import MOTORES
+        best, best_score, GA_LOG = MOTORES[engine](generaciones, t0, max_seconds, early_stop, init,
+                                                   cancelar, progreso, log_comp)
+        if best:
+            with _fase("guardado"):
+                _to_horario(best, engine, best_score)
+        return best, best_score
+
+    lote = pool = None
+    if islas > 1:
+        from .paralelo import PoolFitness
+        pool = PoolFitness(min(workers or islas, islas), _problema(), vectorizado=vectorizado)
+    elif workers and workers > 1:
+        from .paralelo import PoolFitness
+        pool = PoolFitness(workers, _problema(), vectorizado=vectorizado)
+    elif vectorizado:
+        from .fitness_np import EvaluadorLote
+        with _fase("carga"):
+            lote = EvaluadorLote(RESERVAS, DISP, MATERIAS, PLANES, DOCENTES, FIJOS)
+    evaluar = pool.fitness if pool else (lote.fitness if lote else None)
+
+    try:
+        if islas > 1:
+            from .paralelo import ga_islas
+            best, best_score, GA_LOG = ga_islas(pool, generaciones, tam, elite, t0, max_seconds,
+                                                early_stop, incremental, islas, migracion,
+                                                topologia, migrantes, log_comp, init, cancelar,
+                                                progreso, memetico, cache, cruce, torneo,
+                                                adaptativo, reinicios)
+        else:
+            best, best_score = _ga(generaciones, tam, elite, t0, max_seconds, early_stop,
+                                   incremental, evaluar, pool, log_comp, init, cancelar, progreso,
+                                   memetico, CacheFitness(cache) if cache else None, cruce,
+                                   torneo, adaptativo, reinicios)
+    finally:
+        if pool:
+            pool.cerrar()
 
-    pobl = [_random_individuo() for _ in range(tam)]
+    if best:
+        with _fase("guardado"):
+            _to_horario(best, "ga", best_score)
+    return best, best_score
+
+def _ranking(scores, pobl):
+    return sorted(zip(scores, pobl), key=lambda x: x[0], reverse=True)
+
+class CacheFitness:
+    """LRU acotado de fitness por individuo. La clave es la tupla de genes:
+    su hash es barato frente a evaluar y la igualdad descarta colisiones."""
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self.datos = OrderedDict()
+        self.hits = self.misses = 0
+
+    def buscar(self, ind):
+        """(clave, fitness) con fitness None si no está."""
+        clave = tuple(ind)
+        score = self.datos.get(clave)
+        if score is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.datos.move_to_end(clave)
+        return clave, score
+
+    def guardar(self, clave, score):
+        self.datos[clave] = score
+        self.datos.move_to_end(clave)
+        if len(self.datos) > self.maximo:
+            self.datos.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+def _padre(ranked, lim, torneo):
+    """Con `torneo` gana el mejor de `torneo` individuos al azar de toda la
+    población (ranked está ordenado); sin él, uno al azar de los `lim` mejores."""
+    if not torneo:
+        return random.choice(ranked[:lim])[1]
+    return ranked[min(random.sample(range(len(ranked)), min(torneo, len(ranked))))][1]
+
+def _reproducir(ranked, tam, elite, evaluar=None, incremental=True, estados=None, cache=None,
+                cruce="grupos", pm=0.15, torneo=0):
+    """Elites de `ranked` más hijos hasta llenar `tam`; los padres salen de los
+    2*elite mejores o, con `torneo`, por torneo (ver _padre).
+    Devuelve (pobl, scores) de la siguiente generación. Con `cache` los hijos
+    repetidos (iguales a un padre o a uno ya visto) no se vuelven a evaluar."""
+    pobl = [x[1] for x in ranked[:elite]]
+    scores = [x[0] for x in ranked[:elite]]
+    lim = max(2, elite*2)
+    # solo los `lim` mejores (la élite incluida) tienen estado de fitness: son
+    # los que se repiten como padres; los demás padres del torneo casi siempre
+    # tienen un solo hijo y construir su estado cuesta lo mismo que evaluarlo
+    reusables = {id(x[1]) for x in ranked[:lim]}
+    if estados is not None:
+        for k in [k for k in estados if k not in reusables]:
+            del estados[k]
+    else:
+        estados = {}
+    while len(pobl) < tam:
+        with _fase("operadores"):
+            p1 = _padre(ranked, lim, torneo)
+            p2 = _padre(ranked, lim, torneo)
+            child = CRUCES[cruce](p1, p2)
+            child = _mutate(child, pm=pm)
+        pobl.append(child)
+        if evaluar:
+            continue
+        with _fase("evaluacion"):
+            clave, score = cache.buscar(child) if cache else (None, None)
+            if score is None:
+                if incremental:
+                    score = _fitness_hijo(child, [p for p in (p1, p2) if id(p) in reusables], estados)
+                else:
+                    score = _fitness(child)
+                _contar()
+                if cache:
+                    cache.guardar(clave, score)
+        scores.append(score)
+    if evaluar:
+        pendientes = pobl[len(scores):]
+        if not cache:
+            with _fase("evaluacion"):
+                _contar(len(pendientes))
+                return pobl, scores + evaluar(pendientes)
+        vistos = [cache.buscar(ind) for ind in pendientes]
+        faltan = [ind for ind, (_, score) in zip(pendientes, vistos) if score is None]
+        _contar(len(faltan))
+        with _fase("evaluacion"):
+            nuevos = iter(evaluar(faltan) if faltan else ())
+        for clave, score in vistos:
+            if score is None:
+                score = next(nuevos)
+                cache.guardar(clave, score)
+            scores.append(score)
+    return pobl, scores
+
+# Control adaptativo de la mutación y reinicio parcial.
+PM_MAX = 0.3
+
+def _diversidad(pobl, ref):
+    """Fracción media de genes en que los individuos de `pobl` difieren de `ref`."""
+    if not ref or not pobl:
+        return 0.0
+    return sum(sum(1 for a, b in zip(ind, ref) if a != b) for ind in pobl) / (len(ref) * len(pobl))
+
+def _controlar(ranked, elite, pobl, scores, pm):
+    """Ajusta pm tras una generación: `ranked` es la anterior y (pobl, scores)
+    la nueva, con la élite copiada al principio. Si el mejor no mejoró, o la
+    población está casi clonada, la mutación sube hasta PM_MAX; solo baja
+    (hasta 1/len(ind)) mientras el mejor mejora y no más de un quinto de los
+    hijos supera a la élite peor, y si lo supera más de un quinto se mantiene.
+    Devuelve (pm, registro para GA_LOG)."""
+    umbral = ranked[min(elite, len(ranked)) - 1][0]
+    hijos = scores[elite:]
+    exitos = sum(1 for s in hijos if s > umbral) / len(hijos) if hijos else 0.0
+    mejora = max(scores) > ranked[0][0]
+    div = _diversidad(pobl, ranked[0][1])
+    pm_min = 1.0 / max(len(ranked[0][1]), 1)
+    if not mejora or div < 0.01:
+        nuevo = min(PM_MAX, pm * 1.25)
+    elif exitos <= 0.2:
+        nuevo = max(pm_min, pm * 0.8)
+    else:
+        nuevo = pm
+    decision = "sube_pm" if nuevo > pm else ("baja_pm" if nuevo < pm else "mantiene_pm")
+    return nuevo, {"pm": round(nuevo, 4), "exitos": round(exitos, 3), "mejora": mejora,
+                   "diversidad": round(div, 4), "decision": decision}
+
+def _reiniciar(ranked, tam, elite, init, evaluar=None, cache=None):
+    """Reinicio parcial tras un estancamiento: se conserva la élite y el resto
+    se reemplaza, mitad por copias hipermutadas (pm=0.5) de la élite y mitad
+    por individuos nuevos. Con `elite`=0 se hipermuta el mejor. Devuelve
+    (pobl, scores)."""
+    pobl = [x[1] for x in ranked[:elite]]
+    padres = [x[1] for x in ranked[:max(elite, 1)]]
+    nuevos = []
+    with _fase("init"):
+        for i in range(tam - len(pobl)):
+            if i % 2 == 0:
+                nuevos.append(_mutate(random.choice(padres), pm=0.5))
+            else:
+                nuevos.append(_random_individuo(random.Random(random.getrandbits(32)), init))
+    _contar(len(nuevos))
+    with _fase("evaluacion"):
+        scores = evaluar(nuevos) if evaluar else [_fitness(ind) for ind in nuevos]
+    if cache:
+        for ind, score in zip(nuevos, scores):
+            cache.guardar(tuple(ind), score)
+    return pobl + nuevos, [x[0] for x in ranked[:elite]] + scores
+
+def _comp_log(comp, comp_ind, best_ind, log_comp):
+    """Desglose del mejor individuo para GA_LOG, reutilizando el anterior
+    mientras el mejor no cambie. Devuelve (comp, comp_ind)."""
+    if log_comp == "mejora" and comp is not None and best_ind == comp_ind:
+        return comp, comp_ind
+    return _metrics(best_ind), best_ind
+
+def _ga(generaciones, tam, elite, t0, max_seconds, early_stop, incremental, evaluar, pool,
+        log_comp="mejora", init="restringido", cancelar=None, progreso=None, memetico=0,
+        cache=None, cruce="grupos", torneo=0, adaptativo=False, reinicios=0):
+    global GA_LOG
+    # una semilla por individuo: la población inicial es la misma en serie o en paralelo
+    semillas = [random.getrandbits(32) for _ in range(tam)]
+    with _fase("init"):
+        if pool:
+            pobl = pool.individuos(semillas, init)
+        else:
+            pobl = [_random_individuo(random.Random(s), init) for s in semillas]
+    _contar(len(pobl))
+    with _fase("evaluacion"):
+        scores = evaluar(pobl) if evaluar else [_fitness(ind) for ind in pobl]
+    if cache:
+        for ind, score in zip(pobl, scores):
+            cache.guardar(tuple(ind), score)
     GA_LOG = []
     best, best_score, stall = None, -10**9, 0
+    estados = {}
+    comp = comp_ind = None
+    pm, control, hechos = 0.15, None, 0
 
     for gen in range(1, generaciones+1):
-        scores = [_fitness(ind) for ind in pobl]
-        ranked = sorted(zip(scores, pobl), key=lambda x: x[0], reverse=True)
+        with _fase("orden"):
+            ranked = _ranking(scores, pobl)
+        if memetico:
+            with _fase("local"):
+                ranked = _mejorar_elite(ranked, elite, memetico)
         best_ind = ranked[0][1]
         best_val = ranked[0][0]
-        avg_val  = sum(scores)/len(scores)
+        avg_val  = sum(x[0] for x in ranked)/len(ranked)   # ya con la búsqueda local
 
-        comp = _metrics(best_ind)
+        with _fase("metricas"):
+            comp, comp_ind = _comp_log(comp, comp_ind, best_ind, log_comp)
         GA_LOG.append({
             "generacion": gen,
             "best": float(best_val),
@@ -307,25 +905,155 @@ def generar_horario(generaciones=60, tam=40, elite=6, seed=None,
             "comp": comp,
             "time_sec": time.time() - t0
         })
-
-        pobl = [x[1] for x in ranked[:elite]]
+        if FASES:
+            GA_LOG[-1]["tiempos"] = FASES.corte()
+        if cache:
+            GA_LOG[-1]["cache"] = cache.stats()
+        if control:
+            GA_LOG[-1]["control"] = control
+        if progreso:
+            progreso(GA_LOG[-1])
 
         if best_val > best_score:
             best_score = best_val; best = best_ind; stall = 0
         else:
             stall += 1
 
-        lim = max(2, elite*2)
-        while len(pobl) < tam:
-            p1 = random.choice(ranked[:lim])[1]
-            p2 = random.choice(ranked[:lim])[1]
-            child = _crossover(p1, p2, rate=random.uniform(0.3, 0.7))
-            child = _mutate(child, pm=0.15)
-            pobl.append(child)
+        if (time.time()-t0) > max_seconds or (stall >= early_stop and hechos >= reinicios):
+            break
+        if cancelar and cancelar():
+            raise Cancelado()
+
+        if stall >= early_stop:
+            hechos += 1; stall = 0; pm = 0.15
+            pobl, scores = _reiniciar(ranked, tam, elite, init, evaluar, cache)
+            control = {"pm": pm, "decision": "reinicio", "reinicio": hechos}
+            continue
+        pobl, scores = _reproducir(ranked, tam, elite, evaluar, incremental, estados, cache, cruce,
+                                   pm, torneo)
+        if adaptativo:
+            with _fase("operadores"):
+                pm, control = _controlar(ranked, elite, pobl, scores, pm)
+
+    return best, best_score
+
+# ---------------------- REPARACIÓN INCREMENTAL ----------------------
+def _horario_actual():
+    """(id de fila, gen) de cada fila del horario activo."""
+    return [(h.id, (h.grupo_id, h.dia, h.turno.value, h.bloque_inicio, h.bloque_fin, h.materia_id, h.docente_id))
+            for h in versiones.filas().order_by(Horario.id)]
+
+def _invalidos(ind):
+    """Índices de los genes que violan disponibilidad o reservas, pasan de 2
+    bloques al día o chocan con un gen válido anterior del grupo o docente."""
+    malos = set()
+    ocup_g, ocup_d, bloques = defaultdict(int), defaultdict(int), defaultdict(int)
+    for (g,dia,turno,b1,b2,mat,doc) in FIJOS:
+        ocup_d[(doc,dia,turno)] |= _mask_bloques(b1, b2)
+    for i, (g,dia,turno,b1,b2,mat,doc) in enumerate(ind):
+        mask = _mask_bloques(b1, b2)
+        if (not DISP_MASK.get((doc,dia,turno), 0) & _bit_rango(b1, b2)
+                or RES_MASK.get((g,dia,turno,mat), 0) & mask
+                or ocup_g[(g,dia,turno)] & mask or ocup_d[(doc,dia,turno)] & mask
+                or bloques[(g,mat,dia)] + b2 - b1 + 1 > 2):
+            malos.add(i)
+            continue
+        ocup_g[(g,dia,turno)] |= mask
+        ocup_d[(doc,dia,turno)] |= mask
+        bloques[(g,mat,dia)] += b2 - b1 + 1
+    return malos
 
-        if (time.time()-t0) > max_seconds or stall >= early_stop:
+def _ascenso(ind, libres, forma, t_fin):
+    """Búsqueda local sobre los genes `libres` de `ind` (los demás quedan
+    fijos): cada gen toma el mejor día, bloque y docente por delta mientras
+    haya mejora y tiempo. Modifica `ind` y devuelve su estado de fitness."""
+    est = _estado_fitness(ind)
+    while time.time() < t_fin:
+        mejoro = False
+        for i in libres:
+            gen = ind[i]
+            g, mat = gen[0], gen[5]
+            dur, turno = forma[(g,mat)]
+            mejor, mejor_fit = None, -est["pen"]
+            for dia in DIAS:
+                for b1 in range(1, 10 - dur):
+                    for doc in DOCS_X_MAT.get(mat) or [gen[6]]:
+                        cand = (g,dia,turno,b1,b1+dur-1,mat,doc)
+                        if cand == gen:
+                            continue
+                        f = _fitness_delta(est, [gen], [cand])
+                        if f > mejor_fit:
+                            mejor, mejor_fit = cand, f
+            if mejor:
+                _fitness_delta(est, [gen], [mejor], aplicar=True)
+                ind[i] = mejor
+                mejoro = True
+            if time.time() >= t_fin:
+                break
+        if not mejoro:
             break
+    return est
 
-    if best:
-        _to_horario(best)
-    return best, best_score
\ No newline at end of file
+def reparar_horario(max_seconds=1.0, seed=None):
+    """Ajusta el horario guardado a los datos actuales sin volver a correr el GA;
+    `max_seconds` acota la búsqueda local.
+
+    Se descartan las clases que ya no caben en el plan (sesiones de más, grupo
+    o materia sin plan, duración o turno cambiados, docente que ya no imparte
+    la materia), se agregan las que faltan y solo las inválidas y las nuevas
+    se recolocan con búsqueda local; el resto queda donde estaba. Si algo
+    cambió, el resultado se guarda como versión nueva del horario.
+    """
+    rng = random.Random(seed)
+    t0 = time.time()
+    _cargar_problema()
+    t_fin = time.time() + max_seconds
+    forma = {(g,mat): (dur, turno) for (g,mat,ses,dur,turno) in PLANES}
+    objetivo = {key: max(v) for key, v in PLAN_SES.items()}
+
+    filas = _horario_actual()
+    cuenta = defaultdict(int)
+    ids, ind, borrar = [], [], []
+    for rid, gen in filas:
+        g,dia,turno,b1,b2,mat,doc = gen
+        if ((g,mat) not in forma or forma[(g,mat)] != (b2 - b1 + 1, turno)
+                or doc not in DOCS_X_MAT.get(mat, ()) or cuenta[(g,mat)] >= objetivo[(g,mat)]):
+            borrar.append(rid)
+            continue
+        cuenta[(g,mat)] += 1
+        ids.append(rid); ind.append(gen)
+    antes = _fitness([gen for _, gen in filas])
+
+    libres = sorted(_invalidos(ind))
+    fuera = set(libres)
+    validos = [gen for i, gen in enumerate(ind) if i not in fuera]
+    ocup_g, ocup_d, bloques = defaultdict(int), defaultdict(int), defaultdict(int)
+    for (g,dia,turno,b1,b2,mat,doc) in validos + FIJOS:
+        ocup_d[(doc,dia,turno)] |= _mask_bloques(b1, b2)
+    for (g,dia,turno,b1,b2,mat,doc) in validos:
+        ocup_g[(g,dia,turno)] |= _mask_bloques(b1, b2)
+        bloques[(g,mat,dia)] += b2 - b1 + 1
+    for (g,mat), n in objetivo.items():
+        dur, turno = forma[(g,mat)]
+        for _ in range(n - cuenta[(g,mat)]):
+            gen = (_colocar(g, mat, dur, turno, rng, ocup_g, ocup_d, bloques, True)
+                   or _colocar(g, mat, dur, turno, rng, ocup_g, ocup_d, bloques, False)
+                   or (g, rng.choice(DIAS), turno, 1, dur, mat, rng.choice(DOCS_X_MAT.get(mat) or DOCENTES)))
+            _, dia, _, b1, b2, _, doc = gen
+            ocup_g[(g,dia,turno)] |= _mask_bloques(b1, b2)
+            ocup_d[(doc,dia,turno)] |= _mask_bloques(b1, b2)
+            bloques[(g,mat,dia)] += b2 - b1 + 1
+            libres.append(len(ind))
+            ids.append(None); ind.append(gen)
+
+    original = dict(filas)
+    est = _ascenso(ind, libres, forma, t_fin)
+
+    nuevas = ids.count(None)
+    movidas = sum(1 for rid, gen in zip(ids, ind) if rid is not None and original[rid] != gen)
+    version = versiones.version_activa()
+    if borrar or nuevas or movidas:
+        version = versiones.guardar(ind, "reparacion", -est["pen"])
+    return {"antes": antes, "despues": -est["pen"], "movidas": movidas, "nuevas": nuevas,
+            "borradas": len(borrar), "revisadas": len(libres), "version": version,
+            "time_sec": time.time() - t0}
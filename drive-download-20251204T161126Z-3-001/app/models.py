@@ -26,12 +26,21 @@ class Grupo(db.Model):
     nombre = db.Column(db.String(50), nullable=False, unique=True)
     turno = db.Column(SAEnum(Turno, name="turno"), nullable=False)
 
+# Los índices siguen los accesos: por docente/grupo (borrados en cascada,
+# validación, tablero) y por materia (materia_borrar).
 class DocenteMateria(db.Model):
+    __table_args__ = (
+        db.Index("ix_docente_materia_docente", "docente_id", "materia_id"),
+        db.Index("ix_docente_materia_materia", "materia_id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     docente_id = db.Column(db.Integer, db.ForeignKey("docente.id"), nullable=False)
     materia_id = db.Column(db.Integer, db.ForeignKey("materia.id"), nullable=False)
 
 class Disponibilidad(db.Model):
+    __table_args__ = (
+        db.Index("ix_disponibilidad_docente_dia", "docente_id", "dia", "turno"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     docente_id = db.Column(db.Integer, db.ForeignKey("docente.id"), nullable=False)
     dia = db.Column(db.String(20), nullable=False)
@@ -41,6 +50,10 @@ class Disponibilidad(db.Model):
     docente = db.relationship("Docente")
 
 class MateriaGrupo(db.Model):
+    __table_args__ = (
+        db.Index("ix_materia_grupo_grupo", "grupo_id", "materia_id"),
+        db.Index("ix_materia_grupo_materia", "materia_id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     grupo_id = db.Column(db.Integer, db.ForeignKey("grupo.id"), nullable=False)
     materia_id = db.Column(db.Integer, db.ForeignKey("materia.id"), nullable=False)
@@ -49,6 +62,10 @@ class MateriaGrupo(db.Model):
     materia = db.relationship("Materia")
 
 class ReservaModulo(db.Model):
+    __table_args__ = (
+        db.Index("ix_reserva_modulo_grupo_dia", "grupo_id", "dia", "turno"),
+        db.Index("ix_reserva_modulo_materia", "materia_id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     grupo_id = db.Column(db.Integer, db.ForeignKey("grupo.id"), nullable=False)
     materia_id = db.Column(db.Integer, db.ForeignKey("materia.id"), nullable=False)
@@ -59,8 +76,29 @@ class ReservaModulo(db.Model):
     grupo = db.relationship("Grupo")
     materia = db.relationship("Materia")
 
+class HorarioVersion(db.Model):
+    """Un horario completo guardado; solo una versión está activa (ver versiones.py)."""
+    __table_args__ = (
+        db.Index("uq_horario_version_activa", "activa", unique=True,
+                 sqlite_where=db.text("activa"), postgresql_where=db.text("activa")),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    creado_en = db.Column(db.DateTime, default=datetime.utcnow)
+    origen = db.Column(db.String(20))   # "ga", "sa", "tabu", "reparacion"...
+    activa = db.Column(db.Boolean, nullable=False, default=False)
+    filas = db.Column(db.Integer, default=0)
+    fitness = db.Column(db.Float, nullable=True)
+
 class Horario(db.Model):
+    __table_args__ = (
+        # lecturas de la versión activa por grupo (tablero, ver_horario)
+        db.Index("ix_horario_version_grupo", "version_id", "grupo_id", "dia", "bloque_inicio"),
+        db.Index("ix_horario_grupo_dia", "grupo_id", "dia", "bloque_inicio"),
+        db.Index("ix_horario_docente_dia", "docente_id", "dia"),
+        db.Index("ix_horario_materia", "materia_id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
+    version_id = db.Column(db.Integer, db.ForeignKey("horario_version.id"), nullable=False)
     grupo_id = db.Column(db.Integer, db.ForeignKey("grupo.id"), nullable=False)
     materia_id = db.Column(db.Integer, db.ForeignKey("materia.id"), nullable=False)
     docente_id = db.Column(db.Integer, db.ForeignKey("docente.id"), nullable=False)
@@ -80,12 +118,24 @@ class Experimento(db.Model):
     poblacion = db.Column(db.Integer)
     elite = db.Column(db.Integer)
     seed = db.Column(db.Integer, nullable=True)
+    islas = db.Column(db.Integer, default=1)
+    engine = db.Column(db.String(10), default="ga")
     num_grupos_total = db.Column(db.Integer, default=0)
     num_grupos_m = db.Column(db.Integer, default=0)
     num_grupos_v = db.Column(db.Integer, default=0)
     best_final = db.Column(db.Float, default=0.0)
     avg_final = db.Column(db.Float, default=0.0)
     tiempo_total = db.Column(db.Float, default=0.0)
+    # segundos por fase de la corrida (genetico.FASE_NOMBRES) y evaluaciones
+    tiempo_carga = db.Column(db.Float, default=0.0)
+    tiempo_init = db.Column(db.Float, default=0.0)
+    tiempo_evaluacion = db.Column(db.Float, default=0.0)
+    tiempo_operadores = db.Column(db.Float, default=0.0)
+    tiempo_orden = db.Column(db.Float, default=0.0)
+    tiempo_metricas = db.Column(db.Float, default=0.0)
+    tiempo_local = db.Column(db.Float, default=0.0)
+    tiempo_guardado = db.Column(db.Float, default=0.0)
+    evaluaciones = db.Column(db.Integer, default=0)
     conflictos_docente = db.Column(db.Integer, default=0)
     violacion_reserva = db.Column(db.Integer, default=0)
     violacion_disponibilidad = db.Column(db.Integer, default=0)
@@ -97,4 +147,22 @@ class Experimento(db.Model):
     exceso_horas_semanales = db.Column(db.Integer, default=0)
     fig_fitness = db.Column(db.String(255))
     fig_hard = db.Column(db.String(255))
-    log_json = db.Column(db.Text)
\ No newline at end of file
+    log_json = db.Column(db.Text)
+
+class Trabajo(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(20), nullable=False)
+    estado = db.Column(db.String(20), nullable=False, default="pendiente")
+    params_json = db.Column(db.Text)
+    resultado_json = db.Column(db.Text)
+    error = db.Column(db.Text)
+    cancelar = db.Column(db.Boolean, nullable=False, default=False)
+    creado_en = db.Column(db.DateTime, default=datetime.utcnow)
+    iniciado_en = db.Column(db.DateTime)
+    terminado_en = db.Column(db.DateTime)
+
+class DatosVersion(db.Model):
+    """Fila única con un contador que suben las rutas que cambian los datos
+    del problema; problema.py lo usa para saber si su foto sigue vigente."""
+    id = db.Column(db.Integer, primary_key=True)
+    valor = db.Column(db.Integer, nullable=False, default=0)
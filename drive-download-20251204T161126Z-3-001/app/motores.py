@@ -0,0 +1,166 @@
+"""Motores de una sola solución: recocido simulado y búsqueda tabú.
+
+Usan el mismo problema, fitness y movimientos que genetico.py (los de la
+búsqueda local) y evalúan cada movimiento con _fitness_delta. Cada
+"generación" del log es un barrido de movimientos, para que GA_LOG,
+Experimento y las gráficas sigan sirviendo igual que con el GA. Sus barridos
+cuentan como fase "local" y cada movimiento evaluado como una evaluación.
+"""
+import math, random, time
+
+from . import genetico
+
+
+class _Log:
+    """Registro al estilo GA_LOG: best global y, como avg, el fitness actual.
+    `stall` cuenta generaciones sin que mejore el valor `criterio`."""
+    def __init__(self, t0, early_stop, log_comp, progreso):
+        self.t0, self.early_stop, self.log_comp, self.progreso = t0, early_stop, log_comp, progreso
+        self.log = []
+        self.stall = 0
+        self.comp = self.comp_ind = None
+        self.ultimo = None
+
+    def registrar(self, gen, best_score, best, actual, criterio):
+        with genetico._fase("metricas"):
+            self.comp, self.comp_ind = genetico._comp_log(self.comp, self.comp_ind, best, self.log_comp)
+        self.log.append({
+            "generacion": gen,
+            "best": float(best_score),
+            "avg": float(actual),
+            "comp": self.comp,
+            "time_sec": time.time() - self.t0,
+        })
+        if genetico.FASES:
+            self.log[-1]["tiempos"] = genetico.FASES.corte()
+        if self.progreso:
+            self.progreso(self.log[-1])
+        self.stall = self.stall + 1 if self.ultimo is not None and criterio <= self.ultimo else 0
+        self.ultimo = criterio
+
+    def parar(self, max_seconds, cancelar):
+        if cancelar and cancelar():
+            raise genetico.Cancelado()
+        return self.stall >= self.early_stop or (time.time() - self.t0) > max_seconds
+
+
+def _empeoramiento_medio(ind, est, rng, muestras=200):
+    """Promedio de los empeoramientos de movimientos al azar sobre `ind`."""
+    por_grupo = genetico._por_grupo(ind)
+    peores = []
+    for _ in range(muestras):
+        mov = genetico._movimiento(ind, rng, por_grupo)
+        if mov is None:
+            continue
+        idx, poner = mov
+        d = genetico._fitness_delta(est, [ind[k] for k in idx], poner) + est["pen"]
+        if d < 0:
+            peores.append(-d)
+    return sum(peores) / len(peores) if peores else 1.0
+
+def recocido(generaciones, t0, max_seconds, early_stop, init="restringido", cancelar=None,
+             progreso=None, log_comp="mejora", temp_inicial=0.1, temp_final=1e-3):
+    """Recocido simulado con enfriamiento geométrico: la temperatura baja de
+    T0 a T0*`temp_final` a lo largo de `generaciones` barridos de len(ind)
+    movimientos. T0 es `temp_inicial` veces el empeoramiento medio de un
+    movimiento; como se parte de la solución constructiva, conviene que sea
+    baja para no deshacerla. Devuelve (best, best_score, log)."""
+    rng = random.Random(random.getrandbits(32))
+    with genetico._fase("init"):
+        ind = genetico._random_individuo(random.Random(random.getrandbits(32)), init)
+        est = genetico._estado_fitness(ind)
+    genetico._contar()
+    best, best_score = list(ind), -est["pen"]
+    if not ind:
+        return best, best_score, []
+    por_grupo = genetico._por_grupo(ind)
+    temp = temp_inicial * _empeoramiento_medio(ind, est, rng)
+    alfa = temp_final ** (1.0 / max(generaciones, 1))
+    log = _Log(t0, early_stop, log_comp, progreso)
+
+    for gen in range(1, generaciones + 1):
+        evals = 0
+        with genetico._fase("local"):
+            for _ in range(len(ind)):
+                mov = genetico._movimiento(ind, rng, por_grupo)
+                if mov is None:
+                    continue
+                idx, poner = mov
+                quitar = [ind[k] for k in idx]
+                d = genetico._fitness_delta(est, quitar, poner) + est["pen"]
+                evals += 1
+                if d >= 0 or rng.random() < math.exp(d / temp):
+                    genetico._fitness_delta(est, quitar, poner, aplicar=True)
+                    for k, gen_nuevo in zip(idx, poner):
+                        ind[k] = gen_nuevo
+                    if -est["pen"] > best_score:
+                        best, best_score = list(ind), -est["pen"]
+        genetico._contar(evals)
+        temp *= alfa
+        # el recocido se detiene cuando la solución actual deja de mejorar
+        # (ya se "congeló"), no cuando el mejor global se estanca
+        log.registrar(gen, best_score, best, -est["pen"], -est["pen"])
+        if log.parar(max_seconds, cancelar):
+            break
+    return best, best_score, log.log
+
+def tabu(generaciones, t0, max_seconds, early_stop, init="restringido", cancelar=None,
+         progreso=None, log_comp="mejora", vecinos=30, tenencia=None):
+    """Búsqueda tabú: en cada iteración se evalúan `vecinos` movimientos al
+    azar y se aplica el mejor no tabú (aunque empeore), salvo aspiración si
+    supera al mejor global. Un gen no puede volver a su (día, bloque, docente)
+    anterior durante `tenencia` iteraciones. Cada generación del log son
+    len(ind) // `vecinos` iteraciones. Devuelve (best, best_score, log)."""
+    rng = random.Random(random.getrandbits(32))
+    with genetico._fase("init"):
+        ind = genetico._random_individuo(random.Random(random.getrandbits(32)), init)
+        est = genetico._estado_fitness(ind)
+    genetico._contar()
+    best, best_score = list(ind), -est["pen"]
+    if not ind:
+        return best, best_score, []
+    por_grupo = genetico._por_grupo(ind)
+    tenencia = tenencia or max(7, int(math.sqrt(len(ind))))
+    prohibido = {}
+    it = 0
+    log = _Log(t0, early_stop, log_comp, progreso)
+
+    def es_tabu(idx, poner):
+        return any(prohibido.get((k, g[1], g[3], g[6]), -1) > it for k, g in zip(idx, poner))
+
+    for gen in range(1, generaciones + 1):
+        evals = 0
+        with genetico._fase("local"):
+            for _ in range(max(1, len(ind) // vecinos)):
+                it += 1
+                elegido, elegido_fit = None, None
+                for _ in range(vecinos):
+                    mov = genetico._movimiento(ind, rng, por_grupo)
+                    if mov is None:
+                        continue
+                    idx, poner = mov
+                    f = genetico._fitness_delta(est, [ind[k] for k in idx], poner)
+                    evals += 1
+                    if es_tabu(idx, poner) and f <= best_score:
+                        continue
+                    if elegido is None or f > elegido_fit:
+                        elegido, elegido_fit = mov, f
+                if elegido is None:
+                    continue
+                idx, poner = elegido
+                quitar = [ind[k] for k in idx]
+                genetico._fitness_delta(est, quitar, poner, aplicar=True)
+                for k, viejo, nuevo in zip(idx, quitar, poner):
+                    prohibido[(k, viejo[1], viejo[3], viejo[6])] = it + tenencia
+                    ind[k] = nuevo
+                if -est["pen"] > best_score:
+                    best, best_score = list(ind), -est["pen"]
+        genetico._contar(evals)
+        if len(prohibido) > 4 * len(ind):
+            prohibido = {k: v for k, v in prohibido.items() if v > it}
+        log.registrar(gen, best_score, best, -est["pen"], best_score)
+        if log.parar(max_seconds, cancelar):
+            break
+    return best, best_score, log.log
+
+MOTORES = {"sa": recocido, "tabu": tabu}
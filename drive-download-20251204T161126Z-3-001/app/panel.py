@@ -0,0 +1,63 @@
+"""Estadísticas del panel (página de inicio).
+
+Conteos de los catálogos, el último Experimento y la versión activa del
+horario salen de una sola consulta (subconsultas escalares) y quedan en
+memoria del proceso web. Con el cache caliente el panel no toca la base.
+
+El cache se descarta cuando este proceso llama a problema.tocar() (rutas de
+catálogos e importación), cuando termina un trabajo (trabajos.py), al borrar
+un experimento y al cambiar el horario activo (`olvidar()`). Lo que escriban
+otros procesos, como reset_db.py, se ve al vencer PANEL_TTL segundos.
+"""
+import time
+
+from flask import current_app
+from sqlalchemy import func
+
+from . import db, problema
+from .models import (
+    Docente, Materia, Grupo, DocenteMateria, Disponibilidad, MateriaGrupo,
+    Experimento, HorarioVersion
+)
+
+# restricciones duras que guarda Experimento
+DURAS = ("conflictos_docente", "violacion_reserva", "violacion_disponibilidad",
+         "turno_incorrecto", "exceso_sesiones", "falta_sesiones")
+
+_CONTEOS = {"docentes": Docente.id, "materias": Materia.id, "grupos": Grupo.id,
+            "mapeos": DocenteMateria.id, "disponibilidad": Disponibilidad.id,
+            "plan": MateriaGrupo.id}
+_EXPERIMENTO = ("id", "creado_en", "scope", "engine", "best_final", "tiempo_total") + DURAS
+_VERSION = ("id", "creado_en", "origen", "fitness")
+
+_CACHE = None
+
+
+def olvidar():
+    global _CACHE
+    _CACHE = None
+
+def _consultar():
+    q = db.session.query
+    cols = [q(func.count(c)).scalar_subquery().label(k) for k, c in _CONTEOS.items()]
+    cols += [q(getattr(Experimento, k)).order_by(Experimento.id.desc()).limit(1)
+             .scalar_subquery().label("exp_" + k) for k in _EXPERIMENTO]
+    cols += [q(getattr(HorarioVersion, k)).filter(HorarioVersion.activa.is_(True))
+             .order_by(HorarioVersion.id.desc()).limit(1)
+             .scalar_subquery().label("ver_" + k) for k in _VERSION]
+    fila = q(*cols).one()._asdict()
+
+    exp = {k: fila["exp_" + k] for k in _EXPERIMENTO} if fila["exp_id"] is not None else None
+    if exp:
+        exp["duras"] = sum(exp[k] or 0 for k in DURAS)
+    ver = {k: fila["ver_" + k] for k in _VERSION} if fila["ver_id"] is not None else None
+    return {"conteos": {k: fila[k] for k in _CONTEOS}, "experimento": exp, "version": ver}
+
+def estadisticas():
+    """{"conteos", "experimento" (el último o None), "version" (la activa o None)}."""
+    global _CACHE
+    toques = problema.toques()
+    if (_CACHE is None or _CACHE[0] != toques
+            or time.monotonic() - _CACHE[1] > current_app.config.get("PANEL_TTL", 30)):
+        _CACHE = (toques, time.monotonic(), _consultar())
+    return _CACHE[2]
@@ -0,0 +1,202 @@
+"""Evaluación de la población y modelo de islas con un pool de procesos.
+
+Cada proceso recibe los datos del problema una sola vez en su inicializador
+(no con cada tarea) y a partir de ahí solo intercambia individuos y scores.
+"""
+import random, time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import genetico
+
+_LOTE = None
+_CACHES = {}   # isla -> CacheFitness, mientras la isla caiga en este proceso
+
+def _init_worker(datos, vectorizado):
+    global _LOTE
+    genetico._instalar_problema(datos)
+    if vectorizado:
+        from .fitness_np import EvaluadorLote
+        _LOTE = EvaluadorLote(datos["RESERVAS"], datos["DISP"], datos["MATERIAS"],
+                              datos["PLANES"], datos["DOCENTES"], datos["FIJOS"])
+
+def _fitness_trozo(pobl):
+    if _LOTE:
+        return _LOTE.fitness(pobl)
+    return [genetico._fitness(ind) for ind in pobl]
+
+def _individuos_trozo(semillas, orden):
+    return [genetico._random_individuo(random.Random(s), orden) for s in semillas]
+
+
+class PoolFitness:
+    def __init__(self, workers, datos, vectorizado=False):
+        self.workers = workers
+        self.ex = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                      initargs=(datos, vectorizado))
+
+    def _trozos(self, lst):
+        n = max(1, -(-len(lst) // self.workers))
+        return [lst[i:i+n] for i in range(0, len(lst), n)]
+
+    def _map(self, fn, lst, *args):
+        out = []
+        trozos = self._trozos(lst)
+        for parte in self.ex.map(fn, trozos, *([a] * len(trozos) for a in args)):
+            out.extend(parte)
+        return out
+
+    def fitness(self, pobl):
+        return self._map(_fitness_trozo, pobl)
+
+    def individuos(self, semillas, orden="aleatorio"):
+        return self._map(_individuos_trozo, semillas, orden)
+
+    def epocas(self, islas):
+        return list(self.ex.map(_epoca_isla, islas))
+
+    def cerrar(self):
+        self.ex.shutdown()
+
+def _epoca_isla(isla):
+    """Evoluciona una isla `gens` generaciones con su propio estado de RNG."""
+    random.setstate(isla["rng"])
+    genetico.FASES = genetico.Fases()
+    evaluar = _fitness_trozo if _LOTE else None
+    ranked, hist, estados = isla["ranked"], [], {}
+    pm = isla["pm"]
+    cache = None
+    if isla["cache"]:
+        cache = _CACHES.setdefault(isla["k"], genetico.CacheFitness(isla["cache"]))
+    for _ in range(isla["gens"]):
+        h, m = (cache.hits, cache.misses) if cache else (0, 0)
+        pobl, scores = genetico._reproducir(ranked, isla["tam"], isla["elite"], evaluar,
+                                            isla["incremental"], estados, cache, isla["cruce"],
+                                            pm, isla["torneo"])
+        control = None
+        if isla["adaptativo"]:
+            pm, control = genetico._controlar(ranked, isla["elite"], pobl, scores, pm)
+        with genetico._fase("orden"):
+            ranked = genetico._ranking(scores, pobl)
+        if isla["memetico"]:
+            with genetico._fase("local"):
+                ranked = genetico._mejorar_elite(ranked, isla["elite"], isla["memetico"])
+        cambio = (cache.hits - h, cache.misses - m) if cache else None
+        hist.append((ranked[0][0], sum(x[0] for x in ranked)/len(ranked), ranked[0][1], cambio, control,
+                     genetico.FASES.corte()))
+    return dict(isla, ranked=ranked, rng=random.getstate(), pm=pm), hist
+
+def _migrar(islas, topologia, migrantes):
+    """Los `migrantes` mejores de cada isla reemplazan a los peores de sus
+    vecinas: la anterior en "anillo", todas las demás en "todos"."""
+    K = len(islas)
+    emigrantes = [isla["ranked"][:migrantes] for isla in islas]
+    for i, isla in enumerate(islas):
+        origenes = [(i - 1) % K] if topologia == "anillo" else [j for j in range(K) if j != i]
+        llegan = [x for j in origenes for x in emigrantes[j]][:len(isla["ranked"]) // 2]
+        resto = isla["ranked"][:len(isla["ranked"]) - len(llegan)]
+        isla["ranked"] = sorted(resto + llegan, key=lambda x: x[0], reverse=True)
+
+def ga_islas(pool, generaciones, tam, elite, t0, max_seconds, early_stop, incremental,
+             islas, migracion, topologia, migrantes, log_comp="mejora", init="restringido",
+             cancelar=None, progreso=None, memetico=0, cache=256, cruce="grupos", torneo=3,
+             adaptativo=True, reinicios=2):
+    """GA de islas: `islas` subpoblaciones de tamaño `tam` evolucionan en los
+    procesos de `pool` y cada `migracion` generaciones intercambian sus mejores.
+
+    Devuelve (best, best_score, log); cada entrada del log trae el mejor global,
+    en "islas" el best/avg de cada subpoblación y, con `cache`, los aciertos y
+    fallos acumulados de los caches de todas las islas.
+
+    Cada isla adapta su propia pm (su "control" va en "islas"); el reinicio
+    parcial por estancamiento se aplica a todas las islas a la vez.
+
+    Los "tiempos" de cada isla van en "islas" y se suman a los de la corrida,
+    así que con islas las fases cuentan tiempo de CPU de todos los procesos."""
+    semillas = [random.getrandbits(32) for _ in range(islas * tam)]
+    with genetico._fase("init"):
+        pobl = pool.individuos(semillas, init)
+    genetico._contar(len(pobl))
+    with genetico._fase("evaluacion"):
+        scores = pool.fitness(pobl)
+    estado = []
+    for k in range(islas):
+        ranked = genetico._ranking(scores[k*tam:(k+1)*tam], pobl[k*tam:(k+1)*tam])
+        estado.append({"ranked": ranked, "rng": random.Random(random.getrandbits(32)).getstate(),
+                       "tam": tam, "elite": elite, "incremental": incremental, "memetico": memetico,
+                       "cache": cache, "k": k, "cruce": cruce, "pm": 0.15, "torneo": torneo,
+                       "adaptativo": adaptativo})
+
+    log = []
+    best, best_score, stall = None, -10**9, 0
+    comp = comp_ind = None
+    aciertos = [0, 0]
+    hechos, reinicio = 0, None
+
+    def registrar(gen, tops):
+        nonlocal best, best_score, stall, comp, comp_ind
+        best_val, _, best_ind = max(tops, key=lambda x: x[0])[:3]
+        with genetico._fase("metricas"):
+            comp, comp_ind = genetico._comp_log(comp, comp_ind, best_ind, log_comp)
+        for t in tops:
+            if t[5] and genetico.FASES:
+                for fase, seg in t[5]["fases"].items():
+                    genetico.FASES.sumar(fase, seg)
+                genetico.FASES.contar(t[5]["evaluaciones"])
+        log.append({
+            "generacion": gen,
+            "best": float(best_val),
+            "avg": float(sum(t[1] for t in tops) / len(tops)),
+            "comp": comp,
+            "time_sec": time.time() - t0,
+            "islas": [dict({"best": float(t[0]), "avg": float(t[1])},
+                           **({"control": t[4]} if t[4] else {}),
+                           **({"tiempos": t[5]} if t[5] else {})) for t in tops],
+        })
+        if genetico.FASES:
+            log[-1]["tiempos"] = genetico.FASES.corte()
+        if reinicio:
+            log[-1]["control"] = reinicio
+        if cache:
+            for t in tops:
+                if t[3]:
+                    aciertos[0] += t[3][0]; aciertos[1] += t[3][1]
+            log[-1]["cache"] = {"hits": aciertos[0], "misses": aciertos[1]}
+        if progreso:
+            progreso(log[-1])
+        if best_val > best_score:
+            best_score = best_val; best = best_ind; stall = 0
+        else:
+            stall += 1
+
+    gen = 1
+    def tops_iniciales():
+        return [(e["ranked"][0][0], sum(x[0] for x in e["ranked"]) / tam, e["ranked"][0][1], None, None,
+                 None) for e in estado]
+
+    registrar(gen, tops_iniciales())
+    while (gen < generaciones and (stall < early_stop or hechos < reinicios)
+           and (time.time()-t0) <= max_seconds):
+        if cancelar and cancelar():
+            raise genetico.Cancelado()
+        reinicio = None
+        if stall >= early_stop:
+            hechos += 1; stall = 0
+            for e in estado:
+                pobl, scores = genetico._reiniciar(e["ranked"], tam, elite, init, pool.fitness)
+                e.update(ranked=genetico._ranking(scores, pobl), pm=0.15)
+            gen += 1
+            reinicio = {"pm": 0.15, "decision": "reinicio", "reinicio": hechos}
+            registrar(gen, tops_iniciales())
+            continue
+        m = min(migracion, generaciones - gen)
+        res = pool.epocas([dict(e, gens=m) for e in estado])
+        estado = [r[0] for r in res]
+        # las islas ya corrieron las m generaciones: se registran todas y el
+        # reinicio o el fin se deciden al volver al while
+        for j in range(m):
+            gen += 1
+            registrar(gen, [r[1][j] for r in res])
+        with genetico._fase("operadores"):
+            _migrar(estado, topologia, migrantes)
+
+    return best, best_score, log
@@ -0,0 +1,92 @@
+"""Foto de los datos del problema que lee el solver.
+
+`foto()` lee cada tabla una sola vez, solo las columnas que usa el solver, en
+estructuras indexadas por id. La foto queda en memoria del proceso junto con
+el valor de DatosVersion con que se leyó; mientras ese contador no cambie, la
+siguiente llamada la reutiliza sin tocar las tablas. Las rutas y scripts que
+modifican docentes, materias, grupos, planes, reservas o disponibilidad llaman
+a `tocar()` antes de su commit.
+"""
+from collections import defaultdict
+
+from . import db
+from .models import (
+    DatosVersion, Docente, Materia, Grupo, MateriaGrupo, DocenteMateria,
+    Disponibilidad, ReservaModulo
+)
+
+_FOTO = None
+_TOQUES = 0
+
+
+class ProblemSnapshot:
+    """Tablas del problema en estructuras compactas:
+
+    grupos    {grupo: turno}
+    materias  {materia: (bloques_duracion, turno)}
+    docentes  [docente]
+    matxdoc   {docente: {materia}}
+    disp      {(docente, día, turno): [(b1, b2)]}
+    reservas  {(grupo, día, turno): [(b1, b2, materia)]}
+    planes    [(grupo, materia, sesiones, duración, turno)]
+
+    `derivados` es un cache libre para quien construya estructuras sobre la
+    foto (genetico._cargar_problema); se descarta junto con ella.
+    """
+    __slots__ = ("clave", "grupos", "materias", "docentes", "matxdoc", "disp", "reservas",
+                 "planes", "derivados")
+
+    def __init__(self, clave):
+        self.clave = clave
+        q = db.session.query
+        self.grupos = {g: t.value for g, t in q(Grupo.id, Grupo.turno).order_by(Grupo.id)}
+        self.materias = {m: (dur, t.value) for m, dur, t in
+                         q(Materia.id, Materia.bloques_duracion, Materia.turno).order_by(Materia.id)}
+        self.docentes = [d for (d,) in q(Docente.id).order_by(Docente.id)]
+        self.matxdoc = defaultdict(set)
+        for d, m in q(DocenteMateria.docente_id, DocenteMateria.materia_id).order_by(DocenteMateria.id):
+            self.matxdoc[d].add(m)
+        self.disp = defaultdict(list)
+        for d, dia, t, b1, b2 in q(Disponibilidad.docente_id, Disponibilidad.dia, Disponibilidad.turno,
+                                   Disponibilidad.bloque_inicio, Disponibilidad.bloque_fin
+                                   ).order_by(Disponibilidad.id):
+            self.disp[(d, dia, t.value)].append((b1, b2))
+        self.reservas = defaultdict(list)
+        for g, dia, t, b1, b2, m in q(ReservaModulo.grupo_id, ReservaModulo.dia, ReservaModulo.turno,
+                                      ReservaModulo.bloque_inicio, ReservaModulo.bloque_fin,
+                                      ReservaModulo.materia_id).order_by(ReservaModulo.id):
+            self.reservas[(g, dia, t.value)].append((b1, b2, m))
+        self.planes = [(g, m, ses, self.materias[m][0], self.grupos[g]) for g, m, ses in
+                       q(MateriaGrupo.grupo_id, MateriaGrupo.materia_id,
+                         MateriaGrupo.sesiones_por_semana).order_by(MateriaGrupo.id)]
+        self.derivados = {}
+
+
+def version_datos():
+    return db.session.query(DatosVersion.valor).filter_by(id=1).scalar() or 0
+
+def tocar():
+    """Sube el contador de datos en la sesión actual (lo fija el commit de quien llama)."""
+    global _TOQUES
+    _TOQUES += 1
+    if not DatosVersion.query.filter_by(id=1).update({"valor": DatosVersion.valor + 1},
+                                                     synchronize_session=False):
+        db.session.add(DatosVersion(id=1, valor=1))
+
+def toques():
+    """Veces que este proceso llamó a tocar(); para caches que no consultan la base."""
+    return _TOQUES
+
+def foto():
+    """La foto vigente del problema; solo relee las tablas si cambió el contador."""
+    global _FOTO
+    clave = (str(db.engine.url), version_datos())
+    if _FOTO is None or _FOTO.clave != clave:
+        _FOTO = ProblemSnapshot(clave)
+    return _FOTO
+
+def olvidar():
+    """Descarta la foto en memoria; hace falta tras recrear las tablas, que
+    reinicia el contador."""
+    global _FOTO
+    _FOTO = None
@@ -1,6 +1,6 @@
 import os, json, io
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file
-from sqlalchemy import func
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file,
+                   Response, stream_with_context, abort, make_response, current_app)
 from werkzeug.utils import secure_filename
 from datetime import datetime
 from collections import defaultdict
@@ -9,9 +9,11 @@ import pandas as pd
 from . import db
 from .models import (
     Turno, Docente, Materia, DocenteMateria, Disponibilidad,
-    Grupo, MateriaGrupo, ReservaModulo, Horario, DIAS, Experimento
+    Grupo, MateriaGrupo, ReservaModulo, Horario, HorarioVersion, DIAS, Experimento, Trabajo
 )
-from .genetico import generar_horario, get_ga_log
+from . import panel, problema, trabajos, validacion, versiones
+from .genetico import reparar_horario, FASE_NOMBRES, CRUCES
+from .motores import MOTORES
 
 import matplotlib
 matplotlib.use("Agg")
@@ -21,38 +23,111 @@ bp = Blueprint("main", __name__)
 
 # ===================== RUTAS ORIGINALES =====================
 
+@bp.before_app_request
+def _reconciliar_trabajos():
+    trabajos.reconciliar()
+
 # ---------------------- HOME ----------------------
 @bp.route("/")
 def index():
-    c_doc = db.session.query(func.count(Docente.id)).scalar()
-    c_mat = db.session.query(func.count(Materia.id)).scalar()
-    c_grp = db.session.query(func.count(Grupo.id)).scalar()
-    c_map = db.session.query(func.count(DocenteMateria.id)).scalar()
-    c_disp = db.session.query(func.count(Disponibilidad.id)).scalar()
-    c_plan = db.session.query(func.count(MateriaGrupo.id)).scalar()
-    return render_template("index.html",
-                           c_doc=c_doc, c_mat=c_mat, c_grp=c_grp,
-                           c_map=c_map, c_disp=c_disp, c_plan=c_plan)
+    return render_template("index.html", **panel.estadisticas())
+
+SCOPES = ("BOTH", "MATUTINO", "VESPERTINO")
+
+def _param_invalido(msg):
+    if request.accept_mimetypes.best == "application/json":
+        abort(make_response(jsonify(error=msg), 400))
+    abort(400, description=msg)
+
+def _params_ga():
+    """Parámetros del GA desde el formulario de /generar o /experimentos;
+    responde 400 si alguno no es válido, antes de encolar el trabajo."""
+    seed = request.form.get("seed")
+    try:
+        p = dict(
+            gens=int(request.form.get("gens", 60)),
+            tam=int(request.form.get("tam", 40)),
+            elite=int(request.form.get("elite", 6)),
+            seed=int(seed) if (seed and seed.isdigit()) else None,
+            islas=int(request.form.get("islas", 1)),
+            migracion=int(request.form.get("migracion", 5)),
+            memetico=float(request.form.get("memetico") or 0),
+            engine=request.form.get("engine", "ga"),
+            cruce=request.form.get("cruce", "grupos"),
+            torneo=int(request.form.get("torneo", 3)),
+            reinicios=int(request.form.get("reinicios", 2)),
+            scope=request.form.get("scope", "BOTH"),
+        )
+    except ValueError as e:
+        _param_invalido(f"Parámetro numérico inválido: {e}")
+    for nombre, validos in (("engine", ["ga", *MOTORES]), ("cruce", list(CRUCES)), ("scope", SCOPES)):
+        if p[nombre] not in validos:
+            _param_invalido(f"{nombre} '{p[nombre]}' no válido; opciones: {', '.join(validos)}")
+    for nombre, minimo in (("gens", 1), ("tam", 2), ("elite", 0), ("islas", 1), ("migracion", 1),
+                           ("torneo", 0), ("reinicios", 0), ("memetico", 0)):
+        if not p[nombre] >= minimo:
+            _param_invalido(f"{nombre} debe ser al menos {minimo}")
+    if p["elite"] > p["tam"]:
+        _param_invalido(f"elite ({p['elite']}) no puede pasar de tam ({p['tam']})")
+    return p
+
+def _trabajo_encolado(t, destino):
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(trabajos.como_dict(t)), 202
+    flash(f"Trabajo {t.id} en cola.", "success")
+    return redirect(url_for(destino))
 
 @bp.route("/generar", methods=["POST"])
 def generar():
-    gens  = int(request.form.get("gens", 60))
-    tam   = int(request.form.get("tam", 40))
-    elite = int(request.form.get("elite", 6))
-    seed  = request.form.get("seed")
-    scope = request.form.get("scope", "BOTH")
-    turnos = [Turno.MATUTINO, Turno.VESPERTINO]
-    if scope == "MATUTINO": turnos = [Turno.MATUTINO]
-    if scope == "VESPERTINO": turnos = [Turno.VESPERTINO]
-
-    generar_horario(
-        generaciones=gens, tam=tam, elite=elite,
-        seed=int(seed) if (seed and seed.isdigit()) else None,
-        turnos=turnos, verbose=True, max_seconds=60, early_stop=12
-    )
-    flash("Horario generado.", "success")
+    t = trabajos.enviar("generar", _params_ga())
+    return _trabajo_encolado(t, "main.index")
+
+@bp.route("/reparar", methods=["POST"])
+def reparar():
+    """Ajusta el horario guardado tras editar datos, sin correr el GA."""
+    seed = request.form.get("seed")
+    try:
+        max_seconds = float(request.form.get("max_seconds", 1.0))
+    except ValueError:
+        _param_invalido(f"max_seconds '{request.form['max_seconds']}' no es un número")
+    if not max_seconds > 0:
+        _param_invalido("max_seconds debe ser mayor que 0")
+    # corre dentro de la petición: no más de REPARAR_MAX segundos
+    res = reparar_horario(max_seconds=min(max_seconds, current_app.config["REPARAR_MAX"]),
+                          seed=int(seed) if (seed and seed.isdigit()) else None)
+    panel.olvidar()
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(res)
+    flash(f"Horario reparado: {res['movidas']} movidas, {res['nuevas']} nuevas, "
+          f"{res['borradas']} borradas (fitness {res['antes']} → {res['despues']}).", "success")
     return redirect(url_for("main.ver_horario"))
 
+# ---------------------- TRABAJOS ----------------------
+@bp.route("/trabajos")
+def trabajos_lista():
+    q = Trabajo.query
+    if request.args.get("activos"):
+        q = q.filter(Trabajo.estado.in_(["pendiente", "corriendo"]))
+    rows = q.order_by(Trabajo.id.desc()).limit(50).all()
+    return jsonify([trabajos.como_dict(t) for t in rows])
+
+@bp.route("/trabajos/<int:id>")
+def trabajo_estado(id):
+    return jsonify(trabajos.como_dict(Trabajo.query.get_or_404(id)))
+
+@bp.route("/trabajos/<int:id>/stream")
+def trabajo_stream(id):
+    t = Trabajo.query.get_or_404(id)
+    return Response(stream_with_context(trabajos.flujo(t)), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@bp.route("/trabajos/<int:id>/cancelar", methods=["POST"])
+def trabajo_cancelar(id):
+    t = Trabajo.query.get_or_404(id)
+    if t.estado in ("pendiente", "corriendo"):
+        trabajos.cancelar(t)
+    return jsonify(trabajos.como_dict(t))
+
 # ---------------------- DOCENTES ----------------------
 @bp.route("/docente/nuevo", methods=["GET","POST"])
 def docente_nuevo():
@@ -63,6 +138,7 @@ def docente_nuevo():
         db.session.add(d); db.session.commit()
         for mid in request.form.getlist("materias"):
             db.session.add(DocenteMateria(docente_id=d.id, materia_id=int(mid)))
+        problema.tocar()
         db.session.commit()
         flash("Docente creado.", "success")
         return redirect(url_for("main.docente_nuevo"))
@@ -79,6 +155,7 @@ def docente_editar(id):
         DocenteMateria.query.filter_by(docente_id=d.id).delete()
         for mid in request.form.getlist("materias"):
             db.session.add(DocenteMateria(docente_id=d.id, materia_id=int(mid)))
+        problema.tocar()
         db.session.commit()
         flash("Docente actualizado.", "success")
         return redirect(url_for("main.docente_nuevo"))
@@ -91,6 +168,7 @@ def docente_borrar(id):
     Disponibilidad.query.filter_by(docente_id=id).delete()
     Horario.query.filter_by(docente_id=id).delete()
     Docente.query.filter_by(id=id).delete()
+    problema.tocar()
     db.session.commit()
     flash("Docente eliminado.", "success")
     return redirect(url_for("main.docente_nuevo"))
@@ -104,7 +182,7 @@ def materia_nueva():
             turno=Turno(request.form["turno"]),
             bloques_duracion=int(request.form.get("bloques_duracion",2))
         )
-        db.session.add(m); db.session.commit()
+        db.session.add(m); problema.tocar(); db.session.commit()
         flash("Materia creada.", "success")
         return redirect(url_for("main.materia_nueva"))
     mats = Materia.query.order_by(Materia.turno, Materia.nombre).all()
@@ -117,6 +195,7 @@ def materia_editar(id):
         m.nombre = request.form["nombre"].strip()
         m.turno = Turno(request.form["turno"])
         m.bloques_duracion = int(request.form.get("bloques_duracion",2))
+        problema.tocar()
         db.session.commit()
         flash("Materia actualizada.", "success")
         return redirect(url_for("main.materia_nueva"))
@@ -129,6 +208,7 @@ def materia_borrar(id):
     ReservaModulo.query.filter_by(materia_id=id).delete()
     Horario.query.filter_by(materia_id=id).delete()
     Materia.query.filter_by(id=id).delete()
+    problema.tocar()
     db.session.commit()
     flash("Materia eliminada.", "success")
     return redirect(url_for("main.materia_nueva"))
@@ -138,7 +218,7 @@ def materia_borrar(id):
 def grupo_nuevo():
     if request.method == "POST":
         g = Grupo(nombre=request.form["nombre"].strip(), turno=Turno(request.form["turno"]))
-        db.session.add(g); db.session.commit()
+        db.session.add(g); problema.tocar(); db.session.commit()
         flash("Grupo creado.", "success")
         return redirect(url_for("main.grupo_nuevo"))
     grupos = Grupo.query.order_by(Grupo.turno, Grupo.nombre).all()
@@ -150,6 +230,7 @@ def grupo_editar(id):
     if request.method == "POST":
         g.nombre = request.form["nombre"].strip()
         g.turno = Turno(request.form["turno"])
+        problema.tocar()
         db.session.commit()
         flash("Grupo actualizado.", "success")
         return redirect(url_for("main.grupo_nuevo"))
@@ -161,6 +242,7 @@ def grupo_borrar(id):
     ReservaModulo.query.filter_by(grupo_id=id).delete()
     Horario.query.filter_by(grupo_id=id).delete()
     Grupo.query.filter_by(id=id).delete()
+    problema.tocar()
     db.session.commit()
     flash("Grupo eliminado.", "success")
     return redirect(url_for("main.grupo_nuevo"))
@@ -177,6 +259,7 @@ def disponibilidad():
             bloque_inicio=int(request.form["b1"]),
             bloque_fin=int(request.form["b2"])
         ))
+        problema.tocar()
         db.session.commit()
         flash("Disponibilidad agregada.", "success")
         return redirect(url_for("main.disponibilidad"))
@@ -196,6 +279,7 @@ def disponibilidad_editar(id):
         r.turno = Turno(request.form["turno"])
         r.bloque_inicio = int(request.form["b1"])
         r.bloque_fin = int(request.form["b2"])
+        problema.tocar()
         db.session.commit()
         flash("Disponibilidad actualizada.", "success")
         return redirect(url_for("main.disponibilidad"))
@@ -204,6 +288,7 @@ def disponibilidad_editar(id):
 @bp.route("/disponibilidad/<int:id>/borrar")
 def disponibilidad_borrar(id):
     Disponibilidad.query.filter_by(id=id).delete()
+    problema.tocar()
     db.session.commit()
     flash("Disponibilidad eliminada.", "success")
     return redirect(url_for("main.disponibilidad"))
@@ -219,6 +304,7 @@ def plan_grupo():
             materia_id=int(request.form["materia_id"]),
             sesiones_por_semana=int(request.form["sesiones"])
         ))
+        problema.tocar()
         db.session.commit()
         flash("Plan agregado.", "success")
         return redirect(url_for("main.plan_grupo"))
@@ -238,6 +324,7 @@ def plan_editar(id):
         p.grupo_id = int(request.form["grupo_id"])
         p.materia_id = int(request.form["materia_id"])
         p.sesiones_por_semana = int(request.form["sesiones"])
+        problema.tocar()
         db.session.commit()
         flash("Plan actualizado.", "success")
         return redirect(url_for("main.plan_grupo"))
@@ -246,6 +333,7 @@ def plan_editar(id):
 @bp.route("/plan/<int:id>/borrar")
 def plan_borrar(id):
     MateriaGrupo.query.filter_by(id=id).delete()
+    problema.tocar()
     db.session.commit()
     flash("Elemento del plan eliminado.", "success")
     return redirect(url_for("main.plan_grupo"))
@@ -264,6 +352,7 @@ def reservas():
             bloque_inicio=int(request.form["b1"]),
             bloque_fin=int(request.form["b2"])
         ))
+        problema.tocar()
         db.session.commit()
         flash("Reserva creada.", "success")
         return redirect(url_for("main.reservas"))
@@ -286,6 +375,7 @@ def reservas_editar(id):
         r.turno = Turno(request.form["turno"])
         r.bloque_inicio = int(request.form["b1"])
         r.bloque_fin = int(request.form["b2"])
+        problema.tocar()
         db.session.commit()
         flash("Reserva actualizada.", "success")
         return redirect(url_for("main.reservas"))
@@ -294,6 +384,7 @@ def reservas_editar(id):
 @bp.route("/reservas/<int:id>/borrar")
 def reservas_borrar(id):
     ReservaModulo.query.filter_by(id=id).delete()
+    problema.tocar()
     db.session.commit()
     flash("Reserva eliminada.", "success")
     return redirect(url_for("main.reservas"))
@@ -301,17 +392,38 @@ def reservas_borrar(id):
 # ---------------------- VISUALIZACIÓN ----------------------
 @bp.route("/ver_horario")
 def ver_horario():
+    """Horario activo, o la versión `?version=<id>` si se pide una anterior."""
+    activa = versiones.version_activa()
+    version_id = request.args.get("version", type=int) or activa
     q = (db.session.query(Horario, Materia, Docente, Grupo)
          .join(Materia, Horario.materia_id==Materia.id)
          .join(Docente, Horario.docente_id==Docente.id)
          .join(Grupo, Horario.grupo_id==Grupo.id)
+         .filter(Horario.version_id==version_id)
          .order_by(Grupo.nombre, Horario.dia, Horario.bloque_inicio))
     data = [{
         "grupo": g.nombre, "dia": h.dia, "turno": h.turno.value,
         "bloque": f"{h.bloque_inicio}-{h.bloque_fin}",
         "materia": m.nombre, "docente": d.nombre
     } for h,m,d,g in q.all()]
-    return render_template("horario_list.html", data=data)
+    lista = HorarioVersion.query.order_by(HorarioVersion.id.desc()).all()
+    return render_template("horario_list.html", data=data, versiones=lista,
+                           version_id=version_id, activa=activa)
+
+@bp.route("/horario/versiones")
+def horario_versiones():
+    lista = HorarioVersion.query.order_by(HorarioVersion.id.desc()).all()
+    return jsonify([{
+        "id": v.id, "creado_en": v.creado_en.isoformat() if v.creado_en else None,
+        "origen": v.origen, "activa": v.activa, "filas": v.filas, "fitness": v.fitness,
+    } for v in lista])
+
+@bp.route("/horario/versiones/<int:id>/activar", methods=["POST"])
+def horario_version_activar(id):
+    versiones.activar(id)
+    panel.olvidar()
+    flash(f"Versión {id} del horario activada.", "success")
+    return redirect(url_for("main.ver_horario"))
 
 @bp.route("/tablero")
 def tablero():
@@ -322,125 +434,73 @@ def tablero():
 def tablero_data():
     grupo_id = int(request.args.get("grupo_id"))
     g = Grupo.query.get_or_404(grupo_id)
-    rows = (Horario.query.filter_by(grupo_id=grupo_id)
+    rows = (versiones.filas().filter_by(grupo_id=grupo_id)
+            .join(Materia, Horario.materia_id==Materia.id)
+            .join(Docente, Horario.docente_id==Docente.id)
+            .with_entities(Horario.dia, Horario.turno, Horario.bloque_inicio, Horario.bloque_fin,
+                           Materia.nombre, Docente.nombre)
             .order_by(Horario.dia, Horario.bloque_inicio).all())
-    out = []
-    for h in rows:
-        m = Materia.query.get(h.materia_id)
-        d = Docente.query.get(h.docente_id)
-        out.append(dict(dia=h.dia, turno=h.turno.value,
-                        b1=h.bloque_inicio, b2=h.bloque_fin,
-                        materia=m.nombre, docente=d.nombre))
+    out = [dict(dia=dia, turno=turno.value, b1=b1, b2=b2, materia=mat, docente=doc)
+           for dia, turno, b1, b2, mat, doc in rows]
     return jsonify({"grupo": g.nombre, "turno": g.turno.value, "items": out})
 
-# ---------------------- EXPERIMENTOS ----------------------
-def _ensure_dir(path): os.makedirs(path, exist_ok=True)
-
-def _save_fig_to_static(fig, rel_path):
-    static_root = os.path.join(os.path.dirname(__file__), "static")
-    full_dir = os.path.join(static_root, os.path.dirname(rel_path))
-    _ensure_dir(full_dir)
-    fig.savefig(os.path.join(static_root, rel_path), bbox_inches="tight")
-    plt.close(fig)
+@bp.route("/tablero/horario")
+def tablero_horario():
+    """Horario de todos los grupos, o de `?grupo_id=` (repetible) / `?turno=`,
+    en una sola consulta y por columnas: una lista por campo en lugar de un
+    objeto por clase, con días como índice de `dias` y nombres de materias y
+    docentes una sola vez. El ETag es la versión del horario más la de los
+    datos (problema.py); si el cliente ya la tiene, 304 sin consultar nada."""
+    turnos = [t.value for t in Turno]
+    if request.args.get("turno") and request.args["turno"] not in turnos:
+        _param_invalido(f"turno '{request.args['turno']}' no válido; opciones: {', '.join(turnos)}")
+    version_id = request.args.get("version", type=int) or versiones.version_activa() or 0
+    etag = f"{version_id}-{problema.version_datos()}"
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        q = (db.session.query(Grupo.id, Grupo.nombre, Grupo.turno, Horario.dia, Horario.bloque_inicio,
+                              Horario.bloque_fin, Materia.id, Materia.nombre, Docente.id, Docente.nombre)
+             .outerjoin(Horario, (Horario.grupo_id==Grupo.id) & (Horario.version_id==version_id))
+             .outerjoin(Materia, Horario.materia_id==Materia.id)
+             .outerjoin(Docente, Horario.docente_id==Docente.id))
+        ids = request.args.getlist("grupo_id", type=int)
+        if ids:
+            q = q.filter(Grupo.id.in_(ids))
+        if request.args.get("turno"):
+            q = q.filter(Grupo.turno == Turno(request.args["turno"]))
+        q = q.order_by(Grupo.turno, Grupo.nombre, Horario.dia, Horario.bloque_inicio)
+
+        num_dia = {d: i for i, d in enumerate(DIAS)}
+        grupos = {"id": [], "nombre": [], "turno": []}
+        clases = {"grupo": [], "dia": [], "b1": [], "b2": [], "materia": [], "docente": []}
+        materias, docentes = {}, {}
+        for gid, gnom, turno, dia, b1, b2, mid, mnom, did, dnom in q:
+            if not grupos["id"] or grupos["id"][-1] != gid:
+                grupos["id"].append(gid); grupos["nombre"].append(gnom); grupos["turno"].append(turno.value)
+            if dia is None:
+                continue
+            for k, v in (("grupo", gid), ("dia", num_dia[dia]), ("b1", b1), ("b2", b2),
+                         ("materia", mid), ("docente", did)):
+                clases[k].append(v)
+            materias[mid] = mnom
+            docentes[did] = dnom
+        resp = jsonify(version=version_id, dias=DIAS, grupos=grupos, clases=clases,
+                       materias=materias, docentes=docentes)
+    resp.set_etag(etag)
+    resp.cache_control.no_cache = True
+    return resp
 
+# ---------------------- EXPERIMENTOS ----------------------
 @bp.route("/experimentos", methods=["GET"])
 def experimentos():
     rows = Experimento.query.order_by(Experimento.creado_en.desc()).all()
-    return render_template("experimentos.html", rows=rows)
+    return render_template("experimentos.html", rows=rows, fases=FASE_NOMBRES)
 
 @bp.route("/experimentos/run", methods=["POST"])
 def experimentos_run():
-    gens  = int(request.form.get("gens", 60))
-    tam   = int(request.form.get("tam", 40))
-    elite = int(request.form.get("elite", 6))
-    seed  = request.form.get("seed")
-    scope = request.form.get("scope", "BOTH")
-    turnos = [Turno.MATUTINO, Turno.VESPERTINO]
-    if scope == "MATUTINO": turnos = [Turno.MATUTINO]
-    if scope == "VESPERTINO": turnos = [Turno.VESPERTINO]
-
-    gm = Grupo.query.filter_by(turno=Turno.MATUTINO).count()
-    gv = Grupo.query.filter_by(turno=Turno.VESPERTINO).count()
-    total = gm + gv if scope == "BOTH" else (gm if scope == "MATUTINO" else gv)
-
-    generar_horario(
-        generaciones=gens, tam=tam, elite=elite,
-        seed=int(seed) if (seed and seed.isdigit()) else None,
-        turnos=turnos, verbose=True, max_seconds=60, early_stop=12
-    )
-
-    log = get_ga_log()
-    if not log:
-        flash("No se obtuvieron datos del GA_LOG.", "error")
-        return redirect(url_for("main.experimentos"))
-
-    last = log[-1]
-    best_final = float(last.get("best", 0))
-    avg_final  = float(last.get("avg", 0))
-    tiempo     = float(last.get("time_sec", 0))
-    comp_last  = last.get("comp") or {}
-
-    exp = Experimento(
-        scope=scope, generaciones=gens, poblacion=tam, elite=elite,
-        seed=int(seed) if (seed and seed.isdigit()) else None,
-        num_grupos_total=total, num_grupos_m=gm, num_grupos_v=gv,
-        best_final=best_final, avg_final=avg_final, tiempo_total=tiempo,
-        conflictos_docente=int(comp_last.get("conflictos_docente", 0)),
-        violacion_reserva=int(comp_last.get("violacion_reserva", 0)),
-        violacion_disponibilidad=int(comp_last.get("violacion_disponibilidad", 0)),
-        turno_incorrecto=int(comp_last.get("turno_incorrecto", 0)),
-        exceso_sesiones=int(comp_last.get("exceso_sesiones", 0)),
-        falta_sesiones=int(comp_last.get("falta_sesiones", 0)),
-        log_json=json.dumps(log, ensure_ascii=False)
-    )
-    db.session.add(exp); db.session.commit()
-
-    # Fitness
-    gens_x = [e.get("generacion", i+1) for i, e in enumerate(log)]
-    best_y = [float(e.get("best", 0)) for e in log]
-    avg_y  = [float(e.get("avg", 0)) for e in log]
-
-    fig1, ax1 = plt.subplots(figsize=(6,3))
-    ax1.plot(gens_x, best_y, label="Best")
-    ax1.plot(gens_x, avg_y,  label="Avg")
-    ax1.set_title(f"Fitness (Exp {exp.id})")
-    ax1.set_xlabel("Generación"); ax1.set_ylabel("Fitness")
-    ax1.legend()
-    rel1 = f"experimentos/exp_{exp.id}_fitness.png"
-    _save_fig_to_static(fig1, rel1)
-
-    # Restricciones
-    keys = [
-        "conflictos_docente","violacion_reserva","violacion_disponibilidad",
-        "turno_incorrecto","exceso_sesiones","falta_sesiones",
-        "exceso_bloques_dia"
-    ]
-    series = {k:[] for k in keys}
-    for e in log:
-        comp = e.get("comp") or {}
-        for k in keys:
-            series[k].append(float(comp.get(k, 0)))
-
-    fig2, ax2 = plt.subplots(figsize=(6,3))
-    hubo_algo = False
-    for k in keys:
-        if any(v != 0 for v in series[k]):
-            ax2.plot(gens_x, series[k], label=k.replace("_"," "))
-            hubo_algo = True
-    if not hubo_algo:
-        ax2.text(0.5, 0.5, "Sin violaciones registradas",
-                 ha='center', va='center', transform=ax2.transAxes, color="gray")
-    ax2.set_title(f"Restricciones (Exp {exp.id})")
-    ax2.set_xlabel("Generación"); ax2.set_ylabel("Conteo")
-    ax2.legend(fontsize="x-small", ncol=2)
-    rel2 = f"experimentos/exp_{exp.id}_hard.png"
-    _save_fig_to_static(fig2, rel2)
-
-    exp.fig_fitness = rel1; exp.fig_hard = rel2
-    db.session.commit()
-
-    flash(f"Experimento {exp.id} ejecutado y graficado.", "success")
-    return redirect(url_for("main.experimentos"))
+    t = trabajos.enviar("experimento", _params_ga())
+    return _trabajo_encolado(t, "main.experimentos")
 
 @bp.route("/experimentos/<int:exp_id>/borrar", methods=["POST", "GET"])
 def experimentos_borrar(exp_id):
@@ -462,6 +522,7 @@ def experimentos_borrar(exp_id):
 
     db.session.delete(exp)
     db.session.commit()
+    panel.olvidar()
     flash(f"Experimento {exp_id} eliminado.", "success")
     return redirect(url_for("main.experimentos"))
 
@@ -528,6 +589,7 @@ def _limpiar_datos_tipo(tipo):
         Disponibilidad.query.delete()
     if tipo in ['plan', 'completo']:
         MateriaGrupo.query.delete()
+    problema.tocar()
     db.session.commit()
 
 def _importar_materias(df):
@@ -541,6 +603,7 @@ def _importar_materias(df):
         )
         db.session.add(m)
         count += 1
+    problema.tocar()
     db.session.commit()
     return count
 
@@ -563,6 +626,7 @@ def _importar_docentes(df):
                 if materia:
                     db.session.add(DocenteMateria(docente_id=d.id, materia_id=materia.id))
         count += 1
+    problema.tocar()
     db.session.commit()
     return count
 
@@ -576,6 +640,7 @@ def _importar_grupos(df):
         )
         db.session.add(g)
         count += 1
+    problema.tocar()
     db.session.commit()
     return count
 
@@ -594,6 +659,7 @@ def _importar_disponibilidad(df):
             )
             db.session.add(d)
             count += 1
+    problema.tocar()
     db.session.commit()
     return count
 
@@ -612,6 +678,7 @@ def _importar_plan(df):
             )
             db.session.add(p)
             count += 1
+    problema.tocar()
     db.session.commit()
     return count
 
@@ -693,121 +760,8 @@ def validar():
 
 @bp.route("/api/validar")
 def api_validar():
-    """API de validación del sistema"""
-    resultado = {
-        'valido': True,
-        'total_issues': 0,
-        'docentes': {'ok': [], 'issues': []},
-        'materias': {'ok': [], 'issues': []},
-        'grupos': {'ok': [], 'issues': []},
-        'disponibilidad': {'ok': [], 'issues': []},
-        'plan': {'ok': [], 'issues': []},
-        'reservas': {'ok': [], 'issues': []}
-    }
-    
-    # Validar Docentes
-    total_docentes = Docente.query.count()
-    if total_docentes == 0:
-        resultado['docentes']['issues'].append("No hay docentes registrados")
-        resultado['valido'] = False
-    else:
-        resultado['docentes']['ok'].append(f"{total_docentes} docentes registrados")
-        
-        # Docentes sin materias
-        docentes_sin_materias = []
-        for d in Docente.query.all():
-            if DocenteMateria.query.filter_by(docente_id=d.id).count() == 0:
-                docentes_sin_materias.append(d.nombre)
-        
-        if docentes_sin_materias:
-            resultado['docentes']['issues'].append(
-                f"{len(docentes_sin_materias)} docentes sin materias asignadas: {', '.join(docentes_sin_materias[:3])}"
-            )
-    
-    # Validar Materias
-    total_materias = Materia.query.count()
-    if total_materias == 0:
-        resultado['materias']['issues'].append("No hay materias registradas")
-        resultado['valido'] = False
-    else:
-        resultado['materias']['ok'].append(f"{total_materias} materias registradas")
-        
-        # Materias sin docentes
-        materias_sin_docentes = []
-        for m in Materia.query.all():
-            if DocenteMateria.query.filter_by(materia_id=m.id).count() == 0:
-                materias_sin_docentes.append(m.nombre)
-        
-        if materias_sin_docentes:
-            resultado['materias']['issues'].append(
-                f"{len(materias_sin_docentes)} materias sin docentes: {', '.join(materias_sin_docentes[:3])}"
-            )
-    
-    # Validar Grupos
-    total_grupos = Grupo.query.count()
-    if total_grupos == 0:
-        resultado['grupos']['issues'].append("No hay grupos registrados")
-        resultado['valido'] = False
-    else:
-        resultado['grupos']['ok'].append(f"{total_grupos} grupos registrados")
-        matutinos = Grupo.query.filter_by(turno=Turno.MATUTINO).count()
-        vespertinos = Grupo.query.filter_by(turno=Turno.VESPERTINO).count()
-        resultado['grupos']['ok'].append(f"Matutinos: {matutinos}, Vespertinos: {vespertinos}")
-    
-    # Validar Disponibilidad
-    total_disp = Disponibilidad.query.count()
-    if total_disp == 0:
-        resultado['disponibilidad']['issues'].append("No hay disponibilidades registradas")
-        resultado['valido'] = False
-    else:
-        resultado['disponibilidad']['ok'].append(f"{total_disp} registros de disponibilidad")
-        
-        # Docentes sin disponibilidad
-        docentes_sin_disp = []
-        for d in Docente.query.all():
-            if Disponibilidad.query.filter_by(docente_id=d.id).count() == 0:
-                docentes_sin_disp.append(d.nombre)
-        
-        if docentes_sin_disp:
-            resultado['disponibilidad']['issues'].append(
-                f"{len(docentes_sin_disp)} docentes sin disponibilidad: {', '.join(docentes_sin_disp[:3])}"
-            )
-    
-    # Validar Plan
-    total_plan = MateriaGrupo.query.count()
-    if total_plan == 0:
-        resultado['plan']['issues'].append("No hay plan de estudios configurado")
-        resultado['valido'] = False
-    else:
-        resultado['plan']['ok'].append(f"{total_plan} asignaciones materia-grupo")
-        
-        # Grupos sin plan
-        grupos_sin_plan = []
-        for g in Grupo.query.all():
-            if MateriaGrupo.query.filter_by(grupo_id=g.id).count() == 0:
-                grupos_sin_plan.append(g.nombre)
-        
-        if grupos_sin_plan:
-            resultado['plan']['issues'].append(
-                f"{len(grupos_sin_plan)} grupos sin plan: {', '.join(grupos_sin_plan)}"
-            )
-            resultado['valido'] = False
-    
-    # Validar Reservas (opcional)
-    total_reservas = ReservaModulo.query.count()
-    if total_reservas > 0:
-        resultado['reservas']['ok'].append(f"{total_reservas} reservas de módulos configuradas")
-    else:
-        resultado['reservas']['ok'].append("Sin reservas (opcional)")
-    
-    # Contar issues totales
-    for categoria in ['docentes', 'materias', 'grupos', 'disponibilidad', 'plan', 'reservas']:
-        resultado['total_issues'] += len(resultado[categoria]['issues'])
-    
-    if resultado['total_issues'] > 0:
-        resultado['valido'] = False
-    
-    return jsonify(resultado)
+    """API de validación del sistema (reglas en validacion.py)"""
+    return jsonify(validacion.validar())
 
 # ---------------------- MEJORA #4: EXPORTACIÓN ----------------------
 @bp.route("/exportar/excel")
@@ -821,6 +775,7 @@ def exportar_excel():
         .join(Materia, Horario.materia_id==Materia.id)\
         .join(Docente, Horario.docente_id==Docente.id)\
         .join(Grupo, Horario.grupo_id==Grupo.id)\
+        .filter(Horario.version_id==versiones.version_activa())\
         .order_by(Grupo.nombre, Horario.dia, Horario.bloque_inicio).all()
     
     # Crear DataFrame
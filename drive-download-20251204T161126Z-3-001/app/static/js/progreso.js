@@ -0,0 +1,99 @@
+/**
+ * Progreso en vivo de un trabajo del GA (SSE de /trabajos/<id>/stream)
+ */
+
+// Gráfica de convergencia (best / avg por generación) sobre un canvas
+function dibujarConvergencia(canvas, puntos) {
+    const ctx = canvas.getContext('2d');
+    const w = canvas.width = canvas.clientWidth;
+    const h = canvas.height;
+    ctx.clearRect(0, 0, w, h);
+    if (puntos.length === 0) return;
+
+    const valores = puntos.flatMap(p => [p.best, p.avg]);
+    let min = Math.min(...valores), max = Math.max(...valores);
+    if (min === max) { min -= 1; max += 1; }
+    const n = Math.max(puntos.length - 1, 1);
+    const x = i => 40 + (w - 50) * i / n;
+    const y = v => 10 + (h - 30) * (max - v) / (max - min);
+
+    ctx.fillStyle = '#aaa';
+    ctx.font = '11px sans-serif';
+    ctx.fillText(max.toFixed(0), 2, 14);
+    ctx.fillText(min.toFixed(0), 2, h - 20);
+    ctx.fillText('gen ' + puntos[puntos.length - 1].generacion, w - 60, h - 4);
+
+    for (const [campo, color] of [['avg', '#f0ad4e'], ['best', '#5bc0de']]) {
+        ctx.strokeStyle = color;
+        ctx.beginPath();
+        puntos.forEach((p, i) => i === 0 ? ctx.moveTo(x(i), y(p[campo])) : ctx.lineTo(x(i), y(p[campo])));
+        ctx.stroke();
+    }
+}
+
+// Sigue el trabajo `id` en el panel; llama alTerminar(trabajo) al recibir "fin"
+function seguirTrabajo(panel, id, alTerminar) {
+    const estado = panel.querySelector('.progreso-estado');
+    const comp = panel.querySelector('.progreso-comp');
+    const canvas = panel.querySelector('canvas');
+    const detener = panel.querySelector('.progreso-detener');
+    const puntos = [];
+
+    panel.classList.remove('d-none');
+    estado.textContent = `Trabajo ${id} en cola...`;
+    detener.disabled = false;
+    detener.onclick = () => {
+        detener.disabled = true;
+        fetch(`/trabajos/${id}/cancelar`, { method: 'POST' });
+    };
+
+    const es = new EventSource(`/trabajos/${id}/stream`);
+    es.addEventListener('estado', () => {
+        estado.textContent = `Trabajo ${id} corriendo...`;
+    });
+    es.addEventListener('gen', ev => {
+        const e = JSON.parse(ev.data);
+        puntos.push(e);
+        estado.textContent = `Trabajo ${id} · gen ${e.generacion} · best ${e.best.toFixed(0)} · avg ${e.avg.toFixed(1)} · ${e.time_sec.toFixed(1)}s`
+            + (e.control ? ` · pm ${e.control.pm} (${e.control.decision.replace(/_/g, ' ')})` : '');
+        comp.textContent = Object.entries(e.comp || {})
+            .filter(([, v]) => v !== 0)
+            .map(([k, v]) => `${k.replace(/_/g, ' ')}: ${v}`)
+            .join(' · ');
+        dibujarConvergencia(canvas, puntos);
+    });
+    es.addEventListener('fin', ev => {
+        es.close();
+        const t = JSON.parse(ev.data);
+        estado.textContent = `Trabajo ${id}: ${t.estado}` + (t.error ? ` (${t.error})` : '');
+        detener.disabled = true;
+        if (alTerminar) alTerminar(t);
+    });
+}
+
+// Envía el formulario del GA como trabajo y sigue su progreso en el panel
+function enviarConProgreso(form, panel, alTerminar) {
+    form.addEventListener('submit', async ev => {
+        ev.preventDefault();
+        const res = await fetch(form.action, {
+            method: 'POST',
+            body: new FormData(form),
+            headers: { 'Accept': 'application/json' },
+        });
+        if (!res.ok) {
+            const e = await res.json().catch(() => ({}));
+            alert('❌ No se pudo encolar el trabajo' + (e.error ? `: ${e.error}` : ''));
+            return;
+        }
+        const t = await res.json();
+        seguirTrabajo(panel, t.id, alTerminar);
+    });
+}
+
+// Sigue el trabajo activo más reciente, si hay alguno
+async function seguirActivo(panel, alTerminar) {
+    const res = await fetch('/trabajos?activos=1');
+    if (!res.ok) return;
+    const activos = await res.json();
+    if (activos.length > 0) seguirTrabajo(panel, activos[0].id, alTerminar);
+}
@@ -0,0 +1,216 @@
+"""Trabajos en segundo plano: generación de horario y experimentos.
+
+Cada trabajo es una fila de Trabajo. Un pool de procesos persistente, con a lo
+sumo TRABAJOS_MAX procesos, los corre fuera de la petición HTTP; cada proceso
+crea su propia app una sola vez. Cancelar es una bandera en la fila que el GA
+consulta entre generaciones.
+
+El progreso de cada generación viaja por una cola compartida con el pool hasta
+un Canal en memoria por trabajo, que /trabajos/<id>/stream sirve como SSE.
+Los canales viven en el proceso web que encoló el trabajo; con varios
+procesos web, quien se conecta a otro no tiene el canal y recibe el estado
+de la fila de Trabajo por sondeo (sin los eventos por generación).
+
+Al reiniciar el servidor, los trabajos que quedaron pendientes o corriendo se
+marcan con error en la primera petición (reconciliar()).
+"""
+import json, time, threading, multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from flask import current_app
+
+from . import db, panel
+from .models import Trabajo
+from .genetico import Cancelado
+
+# tipo de trabajo -> función de experimentos.py que lo ejecuta
+TIPOS = {"generar": "generar", "experimento": "correr"}
+
+CANALES_MAX = 50
+
+_POOL = None
+_APP = None
+_COLA = None
+_CANALES = OrderedDict()
+_CANALES_LOCK = threading.Lock()
+_RECONCILIADO = False
+
+class Canal:
+    """Eventos (tipo, dato) de un trabajo; "fin" lo cierra. Quien se conecta
+    tarde recibe todo desde el principio."""
+    def __init__(self):
+        self.eventos = []
+        self.cerrado = False
+        self.cond = threading.Condition()
+
+    def publicar(self, tipo, dato):
+        with self.cond:
+            self.eventos.append((tipo, dato))
+            self.cerrado = self.cerrado or tipo == "fin"
+            self.cond.notify_all()
+
+    def leer(self, desde, timeout):
+        with self.cond:
+            if len(self.eventos) <= desde and not self.cerrado:
+                self.cond.wait(timeout)
+            return self.eventos[desde:], self.cerrado
+
+def _canal(tid, crear=False):
+    with _CANALES_LOCK:
+        canal = _CANALES.get(tid)
+        if canal is None and crear:
+            canal = _CANALES[tid] = Canal()
+            viejos = [k for k, c in _CANALES.items() if c.cerrado]
+            for k in viejos[:max(0, len(_CANALES) - CANALES_MAX)]:
+                del _CANALES[k]
+        return canal
+
+def _repartir(cola):
+    while True:
+        tid, tipo, dato = cola.get()
+        _canal(tid, crear=True).publicar(tipo, dato)
+        if tipo == "fin":
+            panel.olvidar()   # el trabajo pudo dejar horario o experimento nuevos
+
+def _pool():
+    global _POOL
+    if _POOL is None:
+        ctx = multiprocessing.get_context("spawn")
+        cola = ctx.Queue()
+        _POOL = ProcessPoolExecutor(max_workers=current_app.config["TRABAJOS_MAX"], mp_context=ctx,
+                                    initializer=_init_proceso, initargs=(cola,))
+        threading.Thread(target=_repartir, args=(cola,), daemon=True).start()
+    return _POOL
+
+def reconciliar():
+    """Marca con error los trabajos pendientes o corriendo que dejó un proceso
+    web anterior: su pool murió con él y nadie los va a terminar. Corre una
+    sola vez por proceso, en su primera petición, antes de que exista el pool
+    de este proceso."""
+    global _RECONCILIADO
+    with _CANALES_LOCK:
+        if _RECONCILIADO:
+            return
+        _RECONCILIADO = True
+    Trabajo.query.filter(Trabajo.estado.in_(["pendiente", "corriendo"])).update(
+        {"estado": "error", "error": "El servidor se reinició antes de que terminara",
+         "terminado_en": datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+
+def enviar(tipo, params):
+    """Registra el trabajo y lo encola; regresa sin esperar a que corra."""
+    t = Trabajo(tipo=tipo, params_json=json.dumps(params))
+    db.session.add(t); db.session.commit()
+    _canal(t.id, crear=True)
+    _pool().submit(_ejecutar, t.id)
+    return t
+
+def _sse(evento, dato):
+    return f"event: {evento}\ndata: {json.dumps(dato, ensure_ascii=False)}\n\n"
+
+TERMINADOS = ("terminado", "error", "cancelado")
+
+def flujo(t, espera=15):
+    """Generador SSE: un evento "gen" por generación y "fin" con el estado
+    final. Si el canal no está en este proceso, ver _sondeo."""
+    canal = _canal(t.id)
+    if canal is None:
+        yield from _sondeo(t.id, espera)
+        return
+    i = 0
+    while True:
+        eventos, cerrado = canal.leer(i, espera)
+        if not eventos and not cerrado:
+            yield ": ping\n\n"
+            continue
+        for tipo, dato in eventos:
+            yield _sse(tipo, dato)
+        i += len(eventos)
+        if cerrado and i >= len(canal.eventos):
+            return
+
+def _sondeo(tid, espera, cada=1.0):
+    """Flujo SSE leyendo la fila de Trabajo cada `cada` s: "estado" cuando
+    cambia y "fin" al terminar. Para trabajos de otro proceso web (o de antes
+    de reiniciar) cuyo canal no está aquí."""
+    previo, ultimo = None, time.time()
+    while True:
+        db.session.rollback()   # cada lectura en su propia transacción
+        t = db.session.get(Trabajo, tid, populate_existing=True)
+        if t is None or t.estado in TERMINADOS:
+            yield _sse("fin", como_dict(t) if t else {"id": tid, "estado": "error"})
+            return
+        if t.estado != previo:
+            previo, ultimo = t.estado, time.time()
+            yield _sse("estado", como_dict(t))
+        elif time.time() - ultimo >= espera:
+            ultimo = time.time()
+            yield ": ping\n\n"
+        time.sleep(cada)
+
+def cancelar(t):
+    if t.estado == "pendiente":
+        t.estado = "cancelado"; t.terminado_en = datetime.utcnow()
+    t.cancelar = True
+    db.session.commit()
+
+def como_dict(t):
+    fecha = lambda d: d.isoformat() if d else None
+    return {
+        "id": t.id, "tipo": t.tipo, "estado": t.estado,
+        "params": json.loads(t.params_json or "{}"),
+        "resultado": json.loads(t.resultado_json) if t.resultado_json else None,
+        "error": t.error, "cancelar": bool(t.cancelar),
+        "creado_en": fecha(t.creado_en), "iniciado_en": fecha(t.iniciado_en),
+        "terminado_en": fecha(t.terminado_en),
+    }
+
+# ---------------------- proceso de trabajo ----------------------
+def _init_proceso(cola):
+    global _COLA
+    _COLA = cola
+
+def _app():
+    global _APP
+    if _APP is None:
+        from . import create_app
+        _APP = create_app()
+    return _APP
+
+def _consulta_cancelar(tid, cada=1.0):
+    """cancelar() para el GA: lee la bandera a lo más una vez por `cada` s."""
+    ultimo = [0.0, False]
+    def fn():
+        if not ultimo[1] and time.time() - ultimo[0] >= cada:
+            ultimo[0] = time.time()
+            ultimo[1] = bool(db.session.query(Trabajo.cancelar).filter_by(id=tid).scalar())
+        return ultimo[1]
+    return fn
+
+def _ejecutar(tid):
+    from . import experimentos
+    with _app().app_context():
+        t = Trabajo.query.get(tid)
+        if t is None or t.estado != "pendiente":
+            if t is not None:
+                _COLA.put((tid, "fin", como_dict(t)))
+            return
+        t.estado = "corriendo"; t.iniciado_en = datetime.utcnow()
+        db.session.commit()
+        _COLA.put((tid, "estado", como_dict(t)))
+        try:
+            fn = getattr(experimentos, TIPOS[t.tipo])
+            res = fn(json.loads(t.params_json), _consulta_cancelar(tid),
+                     lambda e: _COLA.put((tid, "gen", e)))
+            t.estado = "terminado"; t.resultado_json = json.dumps(res)
+        except Cancelado:
+            db.session.rollback()
+            t.estado = "cancelado"
+        except Exception as e:
+            db.session.rollback()
+            t.estado = "error"; t.error = str(e)
+        t.terminado_en = datetime.utcnow()
+        db.session.commit()
+        _COLA.put((tid, "fin", como_dict(t)))
+        db.session.remove()
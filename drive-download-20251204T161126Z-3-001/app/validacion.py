@@ -0,0 +1,111 @@
+"""Validación de los datos del problema (/api/validar).
+
+Cada regla es una función registrada con @regla(categoria); recibe los totales
+por tabla, que salen de una sola consulta, y devuelve (ok, issues), dos listas
+de mensajes. Lo que una regla necesita además de los totales lo pide con una
+consulta agregada (GROUP BY) o un anti-join, nunca una por fila, así que el
+número de consultas no depende del tamaño de los catálogos.
+
+El resultado se guarda en memoria con la versión de datos de problema.py y
+se reutiliza mientras no cambie.
+"""
+from sqlalchemy import func
+
+from . import db, problema
+from .models import (
+    Turno, Docente, Materia, Grupo, DocenteMateria, Disponibilidad, MateriaGrupo, ReservaModulo
+)
+
+CATEGORIAS = ("docentes", "materias", "grupos", "disponibilidad", "plan", "reservas")
+REGLAS = []
+_CACHE = None
+
+
+def regla(categoria):
+    """Registra la regla para `categoria`; corren en orden de registro."""
+    def registrar(fn):
+        REGLAS.append((categoria, fn))
+        return fn
+    return registrar
+
+def _totales():
+    tablas = {"docentes": Docente, "materias": Materia, "grupos": Grupo,
+              "disponibilidad": Disponibilidad, "plan": MateriaGrupo, "reservas": ReservaModulo}
+    fila = db.session.query(*[
+        db.session.query(func.count(m.id)).scalar_subquery().label(k) for k, m in tablas.items()
+    ]).one()
+    return fila._asdict()
+
+def _sin(modelo, hijo, fk):
+    """Nombres de `modelo` sin ninguna fila en `hijo` (anti-join por `fk`)."""
+    return [n for (n,) in db.session.query(modelo.nombre)
+            .outerjoin(hijo, fk == modelo.id)
+            .filter(hijo.id.is_(None))
+            .order_by(modelo.id)]
+
+
+@regla("docentes")
+def _docentes(tot):
+    if not tot["docentes"]:
+        return [], ["No hay docentes registrados"]
+    sin = _sin(Docente, DocenteMateria, DocenteMateria.docente_id)
+    issues = [f"{len(sin)} docentes sin materias asignadas: {', '.join(sin[:3])}"] if sin else []
+    return [f"{tot['docentes']} docentes registrados"], issues
+
+@regla("materias")
+def _materias(tot):
+    if not tot["materias"]:
+        return [], ["No hay materias registradas"]
+    sin = _sin(Materia, DocenteMateria, DocenteMateria.materia_id)
+    issues = [f"{len(sin)} materias sin docentes: {', '.join(sin[:3])}"] if sin else []
+    return [f"{tot['materias']} materias registradas"], issues
+
+@regla("grupos")
+def _grupos(tot):
+    if not tot["grupos"]:
+        return [], ["No hay grupos registrados"]
+    por_turno = dict(db.session.query(Grupo.turno, func.count(Grupo.id)).group_by(Grupo.turno))
+    return [f"{tot['grupos']} grupos registrados",
+            f"Matutinos: {por_turno.get(Turno.MATUTINO, 0)}, "
+            f"Vespertinos: {por_turno.get(Turno.VESPERTINO, 0)}"], []
+
+@regla("disponibilidad")
+def _disponibilidad(tot):
+    if not tot["disponibilidad"]:
+        return [], ["No hay disponibilidades registradas"]
+    sin = _sin(Docente, Disponibilidad, Disponibilidad.docente_id)
+    issues = [f"{len(sin)} docentes sin disponibilidad: {', '.join(sin[:3])}"] if sin else []
+    return [f"{tot['disponibilidad']} registros de disponibilidad"], issues
+
+@regla("plan")
+def _plan(tot):
+    if not tot["plan"]:
+        return [], ["No hay plan de estudios configurado"]
+    sin = _sin(Grupo, MateriaGrupo, MateriaGrupo.grupo_id)
+    issues = [f"{len(sin)} grupos sin plan: {', '.join(sin)}"] if sin else []
+    return [f"{tot['plan']} asignaciones materia-grupo"], issues
+
+@regla("reservas")
+def _reservas(tot):
+    if tot["reservas"]:
+        return [f"{tot['reservas']} reservas de módulos configuradas"], []
+    return ["Sin reservas (opcional)"], []
+
+
+def validar():
+    """Resultado de todas las reglas, como lo devuelve /api/validar."""
+    global _CACHE
+    clave = (str(db.engine.url), problema.version_datos())
+    if _CACHE is not None and _CACHE[0] == clave:
+        return _CACHE[1]
+    tot = _totales()
+    resultado = {c: {"ok": [], "issues": []} for c in CATEGORIAS}
+    for categoria, fn in REGLAS:
+        ok, issues = fn(tot)
+        resultado.setdefault(categoria, {"ok": [], "issues": []})
+        resultado[categoria]["ok"] += ok
+        resultado[categoria]["issues"] += issues
+    total = sum(len(r["issues"]) for r in resultado.values())
+    resultado.update(valido=total == 0, total_issues=total)
+    _CACHE = (clave, resultado)
+    return resultado
@@ -0,0 +1,73 @@
+"""Versiones del horario guardado.
+
+Cada corrida (GA, motor o reparación) escribe sus filas de Horario en una
+versión nueva con un solo INSERT por lotes y después la marca como activa en
+la misma transacción: quien lee ve completa la versión anterior o la nueva,
+nunca una a medias. Las versiones viejas se pueden seguir consultando hasta
+que la poda las borra (HORARIO_VERSIONES en la config, contando la activa).
+"""
+from flask import current_app
+from sqlalchemy import insert
+
+from . import db
+from .models import Horario, HorarioVersion, Turno
+
+
+def version_activa():
+    """Id de la versión activa, o None si aún no hay horario."""
+    return (db.session.query(HorarioVersion.id).filter_by(activa=True)
+            .order_by(HorarioVersion.id.desc()).limit(1).scalar())
+
+def filas(version_id=None):
+    """Query de las filas de Horario de `version_id` (por omisión, la activa)."""
+    if version_id is None:
+        version_id = version_activa()
+    return Horario.query.filter(Horario.version_id == version_id)
+
+def _marcar_activa(version_id):
+    # Dos trabajos que guardan a la vez se turnan sobre la fila activa: el
+    # segundo espera el commit del primero y su UPDATE ya ve la versión que
+    # aquel activó. El índice único parcial de models.py impide en todo caso
+    # dos activas (SQLite ya serializa las escrituras).
+    db.session.query(HorarioVersion.id).filter(HorarioVersion.activa.is_(True)).with_for_update().all()
+    HorarioVersion.query.filter(HorarioVersion.activa.is_(True)).update(
+        {"activa": False}, synchronize_session=False)
+    HorarioVersion.query.filter_by(id=version_id).update({"activa": True}, synchronize_session=False)
+
+def guardar(genes, origen, fitness=None):
+    """Escribe los genes (g, dia, turno, b1, b2, mat, doc) como versión nueva,
+    la activa y poda las viejas. Devuelve el id de la versión."""
+    v = HorarioVersion(origen=origen, filas=len(genes), fitness=fitness)
+    db.session.add(v)
+    db.session.flush()
+    if genes:
+        db.session.execute(insert(Horario), [
+            dict(version_id=v.id, grupo_id=g, materia_id=mat, docente_id=doc, dia=dia,
+                 turno=Turno[turno], bloque_inicio=b1, bloque_fin=b2)
+            for (g,dia,turno,b1,b2,mat,doc) in genes
+        ])
+    _marcar_activa(v.id)
+    db.session.commit()
+    podar()
+    return v.id
+
+def activar(version_id):
+    """Vuelve activa una versión guardada (por ejemplo, para regresar a una anterior)."""
+    HorarioVersion.query.get_or_404(version_id)
+    _marcar_activa(version_id)
+    db.session.commit()
+
+def podar(conservar=None):
+    """Borra las versiones inactivas más viejas hasta dejar `conservar` en
+    total; la activa nunca se borra. Devuelve cuántas borró."""
+    if conservar is None:
+        conservar = current_app.config.get("HORARIO_VERSIONES", 10)
+    inactivas = [vid for (vid,) in db.session.query(HorarioVersion.id)
+                 .filter(HorarioVersion.activa.is_(False))
+                 .order_by(HorarioVersion.id.desc())]
+    viejas = inactivas[max(conservar - 1, 0):]
+    if viejas:
+        Horario.query.filter(Horario.version_id.in_(viejas)).delete(synchronize_session=False)
+        HorarioVersion.query.filter(HorarioVersion.id.in_(viejas)).delete(synchronize_session=False)
+        db.session.commit()
+    return len(viejas)
@@ -0,0 +1 @@
+"""Benchmarks del solver; ver __main__.py."""
@@ -0,0 +1,113 @@
+"""Benchmarks del solver sobre instancias sintéticas.
+
+    python -m benchmarks                         # 3, 30 y 300 grupos
+    python -m benchmarks --grupos 30 --segundos 2
+    python -m benchmarks --guardar-base          # fija la línea base
+
+Cada caso se repite hasta juntar `--segundos`, en `--repeticiones` tandas de
+las que se toma la más rápida, y se reporta en operaciones por segundo
+(evaluaciones/s para fitness y metrics, generaciones/s para generacion);
+antes, una sola llamada bajo tracemalloc con random.seed(0) da el pico de memoria.
+Los resultados se guardan en `--salida` y se comparan con `--base`: si un
+caso baja sus ops/s o sube su pico (más de 64 KiB) más de `--tolerancia`, se marca como
+regresión y el comando termina con código 1.
+
+Usa una base SQLite temporal; no toca la base de la aplicación.
+"""
+import argparse, json, os, platform, random, sys, tempfile
+from datetime import datetime
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+
+
+def correr(tamanos, segundos, repeticiones):
+    from app import create_app, genetico
+    from .instancias import construir
+    from .solver import casos, medir, pico_kb
+
+    app = create_app()
+    resultados = {}
+    with app.app_context():
+        for n in tamanos:
+            construir(n)
+            random.seed(0)
+            genetico._cargar_problema()
+            fila = {}
+            for nombre, fn in casos().items():
+                # el pico va primero y con la semilla fija: generacion guarda
+                # estado entre llamadas y su pico depende de cuántas corrieron
+                random.seed(0)
+                pico = pico_kb(fn)
+                fila[nombre] = {"por_seg": round(medir(fn, segundos, repeticiones), 2), "pico_kb": pico}
+                print(f"  {n:>4} grupos  {nombre:<17} {fila[nombre]['por_seg']:>12.2f}/s"
+                      f"  {fila[nombre]['pico_kb']:>8} KiB")
+            resultados[str(n)] = {"genes": len(genetico.DEMANDAS), "casos": fila}
+    return resultados
+
+def comparar(actual, base, tolerancia):
+    """Imprime la comparación contra `base` y devuelve las regresiones."""
+    regresiones = []
+    print(f"\n{'grupos':>6} {'caso':<17} {'ops/s':>12} {'base':>12} {'Δ':>7}  {'pico':>8} {'Δ':>7}")
+    for n, fila in actual.items():
+        for nombre, r in fila["casos"].items():
+            b = base.get(n, {}).get("casos", {}).get(nombre)
+            if not b:
+                continue
+            d_vel = r["por_seg"] / b["por_seg"] - 1 if b["por_seg"] else 0.0
+            d_mem = r["pico_kb"] / b["pico_kb"] - 1 if b["pico_kb"] else 0.0
+            # picos de unos pocos KiB varían mucho entre corridas
+            malo = d_vel < -tolerancia or (d_mem > tolerancia and r["pico_kb"] - b["pico_kb"] > 64)
+            if malo:
+                regresiones.append((n, nombre))
+            print(f"{n:>6} {nombre:<17} {r['por_seg']:>12.2f} {b['por_seg']:>12.2f} {d_vel:>+7.0%}"
+                  f"  {r['pico_kb']:>8} {d_mem:>+7.0%}" + ("  ⚠️ regresión" if malo else ""))
+    return regresiones
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmarks del solver")
+    ap.add_argument("--grupos", type=int, nargs="+", default=[3, 30, 300])
+    ap.add_argument("--segundos", type=float, default=1.0, help="tiempo mínimo por caso")
+    ap.add_argument("--repeticiones", type=int, default=7, help="tandas por caso; cuenta la más rápida")
+    ap.add_argument("--salida", default=os.path.join(AQUI, "ultimo.json"))
+    ap.add_argument("--base", default=os.path.join(AQUI, "baseline.json"))
+    ap.add_argument("--tolerancia", type=float, default=0.4)
+    ap.add_argument("--guardar-base", action="store_true", help="guarda el resultado como línea base")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tmp, "bench.db")
+        resultados = correr(args.grupos, args.segundos, args.repeticiones)
+
+    salida = {
+        "meta": {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "maquina": platform.platform(),
+            "segundos": args.segundos,
+            "repeticiones": args.repeticiones,
+        },
+        "resultados": resultados,
+    }
+    with open(args.salida, "w") as f:
+        json.dump(salida, f, indent=2)
+    print(f"\n💾 Resultados en {args.salida}")
+
+    if args.guardar_base:
+        with open(args.base, "w") as f:
+            json.dump(salida, f, indent=2)
+        print(f"📌 Línea base guardada en {args.base}")
+        return 0
+    if not os.path.exists(args.base):
+        print("Sin línea base; usa --guardar-base para crearla")
+        return 0
+    with open(args.base) as f:
+        base = json.load(f)
+    regresiones = comparar(resultados, base["resultados"], args.tolerancia)
+    if regresiones:
+        print(f"\n❌ {len(regresiones)} regresiones (tolerancia {args.tolerancia:.0%})")
+        return 1
+    print("\n✅ Sin regresiones")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
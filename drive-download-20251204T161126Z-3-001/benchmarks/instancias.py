@@ -0,0 +1,61 @@
+"""Instancias sintéticas para los benchmarks.
+
+Con `n` grupos hay 12 materias por turno, n docentes (mínimo 6) que imparten
+4 materias cada uno, disponibilidad parcial por día y turno, 6 materias por
+grupo con 1 a 3 sesiones y un par de reservas por grupo. Misma `seed`, misma
+instancia.
+"""
+import random
+
+from app import db, problema
+from app.models import (
+    Turno, DIAS, Docente, Materia, Grupo, DocenteMateria,
+    Disponibilidad, MateriaGrupo, ReservaModulo
+)
+
+
+def construir(n, seed=1):
+    """Borra y vuelve a crear las tablas con una instancia de `n` grupos."""
+    rnd = random.Random(seed)
+    db.drop_all()
+    db.create_all()
+    problema.olvidar()
+
+    mats = []
+    for t in Turno:
+        for i in range(12):
+            m = Materia(nombre=f"{t.value[0]}{i}", turno=t, bloques_duracion=rnd.choice([1, 2, 2]))
+            db.session.add(m); mats.append(m)
+    db.session.flush()
+
+    docs = []
+    for i in range(max(6, n)):
+        d = Docente(nombre=f"D{i}"); db.session.add(d); docs.append(d)
+    db.session.flush()
+    for d in docs:
+        for m in rnd.sample(mats, 4):
+            db.session.add(DocenteMateria(docente_id=d.id, materia_id=m.id))
+        for dia in DIAS:
+            for t in Turno:
+                if rnd.random() < 0.7:
+                    a = rnd.randint(1, 4); b = rnd.randint(a, 8)
+                    db.session.add(Disponibilidad(docente_id=d.id, dia=dia, turno=t,
+                                                  bloque_inicio=a, bloque_fin=b))
+
+    grupos = []
+    for i in range(n):
+        g = Grupo(nombre=f"G{i}", turno=Turno.MATUTINO if i % 2 == 0 else Turno.VESPERTINO)
+        db.session.add(g); grupos.append(g)
+    db.session.flush()
+    for g in grupos:
+        propias = [m for m in mats if m.turno == g.turno]
+        for m in rnd.sample(propias, 6):
+            db.session.add(MateriaGrupo(grupo_id=g.id, materia_id=m.id,
+                                        sesiones_por_semana=rnd.randint(1, 3)))
+        for _ in range(2):
+            m = rnd.choice(propias)
+            a = rnd.randint(1, 7)
+            db.session.add(ReservaModulo(grupo_id=g.id, materia_id=m.id, dia=rnd.choice(DIAS),
+                                         turno=g.turno, bloque_inicio=a,
+                                         bloque_fin=min(8, a + rnd.randint(0, 1))))
+    db.session.commit()
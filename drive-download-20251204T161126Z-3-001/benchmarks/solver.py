@@ -0,0 +1,66 @@
+"""Casos de benchmark de los caminos calientes de genetico.py.
+
+Cada caso es una función sin argumentos que hace una operación (una
+evaluación, una mutación, una generación...). Se arman sobre el problema ya
+cargado de la instancia actual.
+"""
+import itertools, random, time, tracemalloc
+
+from app import genetico as G, problema
+
+
+def medir(fn, segundos, repeticiones=5):
+    """Operaciones por segundo de `fn`: `repeticiones` tandas de al menos
+    `segundos`/`repeticiones` cada una, y la más rápida. Las interrupciones
+    de la máquina solo hacen más lenta una tanda, así que el máximo varía
+    mucho menos entre corridas que una sola medición larga."""
+    mejor = 0.0
+    for _ in range(repeticiones):
+        n, t0 = 0, time.perf_counter()
+        while True:
+            fn()
+            n += 1
+            dt = time.perf_counter() - t0
+            if dt >= segundos / repeticiones:
+                break
+        mejor = max(mejor, n / dt)
+    return mejor
+
+def pico_kb(fn):
+    """Pico de memoria (KiB) asignada durante una llamada a `fn`."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+def casos(tam=40, elite=6):
+    """Casos sobre el problema cargado: {nombre: fn}. La generación es la del
+    GA por defecto (torneo, cruce por grupos, cache) con población `tam`: el
+    mismo _reproducir que corre _ga, sin el registro de GA_LOG."""
+    pobl = [G._random_individuo(random.Random(s), "restringido") for s in range(tam)]
+    ciclo = itertools.cycle(pobl)
+    a, b = pobl[0], pobl[1]
+    rng = random.Random(0)
+
+    estado = {"ranked": G._ranking([G._fitness(ind) for ind in pobl], pobl)}
+    estados, cache = {}, G.CacheFitness(256)
+
+    def generacion():
+        nueva, scores = G._reproducir(estado["ranked"], tam, elite, None, True, estados, cache,
+                                      "grupos", 0.15, 3)
+        estado["ranked"] = G._ranking(scores, nueva)
+
+    return {
+        "cargar_problema": lambda: (problema.olvidar(), G._cargar_problema()),
+        "cargar_problema_cache": G._cargar_problema,
+        "fitness": lambda: G._fitness(next(ciclo)),
+        "metrics": lambda: G._metrics(next(ciclo)),
+        "random_individuo": lambda: G._random_individuo(rng, "restringido"),
+        "mutate": lambda: G._mutate(next(ciclo), pm=0.15),
+        "crossover": lambda: G._crossover(a, b, 0.5),
+        "cruce_grupos": lambda: G._cruce_grupos(a, b),
+        "generacion": generacion,
+        "to_horario": lambda: G._to_horario(a),
+    }
@@ -2,7 +2,7 @@
 Script para cargar datos de prueba - FASE 1: 3 GRUPOS DEL 1ER CUATRIMESTRE
 Ingeniería en Sistemas Computacionales - UPQ
 """
-from app import create_app, db
+from app import create_app, db, problema
 from app.models import Turno, Docente, Materia, Grupo, DocenteMateria, Disponibilidad, MateriaGrupo
 
 app = create_app()
@@ -229,6 +229,8 @@ def cargar_plan_estudios():
                 db.session.add(mg)
                 count += 1
         
+        # última etapa de la carga: invalida la foto del problema (problema.py)
+        problema.tocar()
         db.session.commit()
         print(f"✓ {count} asignaciones de plan de estudios creadas")
         print(f"  (7 materias × 3 grupos = {count} asignaciones)")
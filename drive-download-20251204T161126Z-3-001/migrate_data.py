@@ -1,10 +1,10 @@
 # migrate_data.py - Migrar datos de SQLite a PostgreSQL
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from app.models import (
-    Docente, Materia, Grupo, DocenteMateria, Disponibilidad,
-    MateriaGrupo, ReservaModulo, Horario, Experimento
+    Turno, Docente, Materia, Grupo, DocenteMateria, Disponibilidad,
+    MateriaGrupo, ReservaModulo, Horario, HorarioVersion, Experimento
 )
 
 # Configurar conexiones
@@ -29,6 +29,32 @@ def migrate_table(model_class, session_sqlite, session_postgres):
     session_postgres.commit()
     print(f"  → {len(items)} registros migrados.")
 
+def migrate_horarios(session_sqlite, session_postgres):
+    """Migra las versiones del horario y sus filas. Una base anterior al
+    versionado (sin horario_version) queda como una sola versión activa."""
+    print("Migrando horario_version y horario...")
+    filas = [dict(f) for f in session_sqlite.execute(text("SELECT * FROM horario")).mappings()]
+    nuevas = {}   # version_id en SQLite -> en PostgreSQL
+    if "horario_version" in inspect(sqlite_engine).get_table_names():
+        for v in session_sqlite.query(HorarioVersion).order_by(HorarioVersion.id):
+            nueva = HorarioVersion(creado_en=v.creado_en, origen=v.origen, activa=v.activa,
+                                   filas=v.filas, fitness=v.fitness)
+            session_postgres.add(nueva)
+            session_postgres.flush()
+            nuevas[v.id] = nueva.id
+    elif filas:
+        nueva = HorarioVersion(origen="migracion", activa=True, filas=len(filas))
+        session_postgres.add(nueva)
+        session_postgres.flush()
+        nuevas[None] = nueva.id
+    for f in filas:
+        del f["id"]
+        f["version_id"] = nuevas[f.get("version_id")]
+        f["turno"] = Turno[f["turno"]]
+        session_postgres.add(Horario(**f))
+    session_postgres.commit()
+    print(f"  → {len(nuevas)} versiones y {len(filas)} filas migradas.")
+
 def main():
     session_sqlite = SessionSQLite()
     session_postgres = SessionPostgres()
@@ -42,8 +68,10 @@ def main():
         migrate_table(Disponibilidad, session_sqlite, session_postgres)
         migrate_table(MateriaGrupo, session_sqlite, session_postgres)
         migrate_table(ReservaModulo, session_sqlite, session_postgres)
-        migrate_table(Horario, session_sqlite, session_postgres)
+        migrate_horarios(session_sqlite, session_postgres)
         migrate_table(Experimento, session_sqlite, session_postgres)
+        # Trabajo (historial de corridas en segundo plano) y DatosVersion (el
+        # contador de cambios, que tocar() vuelve a crear) no se migran
 
         print("¡Migración completada exitosamente!")
 
@@ -1,8 +1,8 @@
-from app import create_app, db
+from app import create_app, db, problema
 from app.models import (
     Docente, Materia, Grupo, DocenteMateria, 
     Disponibilidad, MateriaGrupo, ReservaModulo, 
-    Horario, Experimento
+    Horario, HorarioVersion, Experimento
 )
 
 app = create_app()
@@ -15,6 +15,7 @@ def reset_database():
         # Eliminar en orden correcto (respetando foreign keys)
         print("  - Eliminando horarios...")
         Horario.query.delete()
+        HorarioVersion.query.delete()
         
         print("  - Eliminando experimentos...")
         Experimento.query.delete()
@@ -40,6 +41,7 @@ def reset_database():
         print("  - Eliminando grupos...")
         Grupo.query.delete()
         
+        problema.tocar()
         db.session.commit()
         print("\n✅ Base de datos limpiada correctamente")
         print("📊 Resumen:")
@@ -0,0 +1,20 @@
+"""Fixtures comunes: la app sobre una base SQLite temporal."""
+import pytest
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///" + str(tmp_path / "pruebas.db"))
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        yield app
+
+@pytest.fixture
+def problema(app):
+    """Instancia sintética de 30 grupos (benchmarks/instancias.py) ya cargada."""
+    from app import genetico
+    from benchmarks.instancias import construir
+    construir(30)
+    genetico._cargar_problema()
+    return genetico
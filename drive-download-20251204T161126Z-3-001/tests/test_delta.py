@@ -0,0 +1,33 @@
+"""Evaluación por delta (_fitness_delta, _fitness_hijo) contra recalcular
+_fitness completo."""
+import random
+
+from app import genetico as G
+
+
+def test_delta_igual_a_recalcular(problema):
+    rng = random.Random(5)
+    random.seed(5)
+    ind = G._random_individuo(random.Random(5))
+    est = G._estado_fitness(ind)
+    for _ in range(300):
+        hijo = G._mutate(ind, pm=rng.choice([0.01, 0.05, 0.3]))
+        quitar = [a for a, b in zip(ind, hijo) if a != b]
+        poner = [b for a, b in zip(ind, hijo) if a != b]
+        assert G._fitness_delta(est, quitar, poner) == G._fitness(hijo)
+        if rng.random() < 0.3:
+            # el estado aplicado debe seguir sirviendo para los siguientes deltas
+            G._fitness_delta(est, quitar, poner, aplicar=True)
+            ind = hijo
+            assert est["pen"] == -G._fitness(ind)
+
+def test_fitness_hijo_igual_a_recalcular(problema):
+    rng = random.Random(6)
+    random.seed(6)
+    pobl = [G._random_individuo(random.Random(s)) for s in range(8)]
+    estados = {}
+    for _ in range(300):
+        p1, p2 = rng.sample(pobl, 2)
+        hijo = G._mutate(G.CRUCES[rng.choice(list(G.CRUCES))](p1, p2), pm=rng.choice([0.0, 0.02, 0.2]))
+        assert G._fitness_hijo(hijo, (p1, p2), estados) == G._fitness(hijo)
+        pobl[rng.randrange(len(pobl))] = hijo
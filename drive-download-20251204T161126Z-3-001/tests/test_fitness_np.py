@@ -0,0 +1,37 @@
+"""EvaluadorLote contra la evaluación base de test_traslapes y, con alcance
+por turno (genes fijos), contra _fitness y _metrics."""
+import random
+
+from app import genetico as G, versiones
+from app.fitness_np import EvaluadorLote
+from test_traslapes import _evaluar_base
+
+
+def _poblacion(n, semilla):
+    rng = random.Random(semilla)
+    pobl = [G._random_individuo(random.Random(s), init) for s, init in
+            enumerate(["restringido", "aleatorio"] * 3)]
+    while len(pobl) < n:
+        pobl.append(G._mutate(rng.choice(pobl), pm=rng.choice([0.05, 0.3, 1.0])))
+    return pobl
+
+def _lote():
+    return EvaluadorLote(G.RESERVAS, G.DISP, G.MATERIAS, G.PLANES, G.DOCENTES, G.FIJOS)
+
+def test_lote_igual_a_la_base(problema):
+    random.seed(2)
+    pobl = _poblacion(120, 2)
+    base = [_evaluar_base(ind) for ind in pobl]
+    lote = _lote()
+    assert lote.fitness(pobl) == [f for f, _ in base]
+    assert lote.metricas(pobl) == [m for _, m in base]
+
+def test_lote_con_alcance_y_fijos(problema):
+    random.seed(4)
+    versiones.guardar(G._random_individuo(random.Random(4)), "ga")
+    G._cargar_problema(["MATUTINO"])
+    assert G.FIJOS
+    pobl = _poblacion(80, 4)
+    lote = _lote()
+    assert lote.fitness(pobl) == [G._fitness(ind) for ind in pobl]
+    assert lote.metricas(pobl) == [G._metrics(ind) for ind in pobl]
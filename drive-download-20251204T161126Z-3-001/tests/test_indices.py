@@ -0,0 +1,64 @@
+"""Los accesos frecuentes usan los índices de la migración de índices de
+consulta. Se aplican las migraciones y se revisa el plan de cada consulta:
+EXPLAIN QUERY PLAN en SQLite (base temporal) y EXPLAIN en PostgreSQL, este
+solo si DATABASE_URL apunta a una base PostgreSQL de pruebas."""
+import os
+
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import text
+
+from app import db
+
+MIGRACIONES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+URL_PG = os.environ.get("DATABASE_URL", "")
+
+# (consulta, índice que debe usar)
+ACCESOS = [
+    # tablero / ver_horario: versión activa por grupo
+    ("SELECT * FROM horario WHERE version_id = 1 AND grupo_id = 1", "ix_horario_version_grupo"),
+    ("SELECT * FROM horario WHERE grupo_id = 1", "ix_horario_grupo_dia"),
+    ("SELECT * FROM horario WHERE docente_id = 1", "ix_horario_docente_dia"),
+    ("SELECT * FROM disponibilidad WHERE docente_id = 1", "ix_disponibilidad_docente_dia"),
+    # borrados en cascada de docente_borrar, materia_borrar y grupo_borrar
+    ("DELETE FROM docente_materia WHERE docente_id = 1", "ix_docente_materia_docente"),
+    ("DELETE FROM disponibilidad WHERE docente_id = 1", "ix_disponibilidad_docente_dia"),
+    ("DELETE FROM horario WHERE docente_id = 1", "ix_horario_docente_dia"),
+    ("DELETE FROM docente_materia WHERE materia_id = 1", "ix_docente_materia_materia"),
+    ("DELETE FROM materia_grupo WHERE materia_id = 1", "ix_materia_grupo_materia"),
+    ("DELETE FROM reserva_modulo WHERE materia_id = 1", "ix_reserva_modulo_materia"),
+    ("DELETE FROM horario WHERE materia_id = 1", "ix_horario_materia"),
+    ("DELETE FROM materia_grupo WHERE grupo_id = 1", "ix_materia_grupo_grupo"),
+    ("DELETE FROM reserva_modulo WHERE grupo_id = 1", "ix_reserva_modulo_grupo_dia"),
+    ("DELETE FROM horario WHERE grupo_id = 1", "ix_horario_grupo_dia"),
+]
+
+
+def _plan_sqlite(sql):
+    return " ".join(r[-1] for r in db.session.execute(text("EXPLAIN QUERY PLAN " + sql)))
+
+def _plan_pg(sql):
+    # con tablas casi vacías el planificador prefiere el barrido secuencial
+    db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    return " ".join(r[0] for r in db.session.execute(text("EXPLAIN " + sql)))
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def plan(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        monkeypatch.setenv("DATABASE_URL", "sqlite:///" + str(tmp_path / "indices.db"))
+        explicar = _plan_sqlite
+    else:
+        if not URL_PG.startswith("postgresql"):
+            pytest.skip("DATABASE_URL no es una base PostgreSQL")
+        monkeypatch.setenv("DATABASE_URL", URL_PG)
+        explicar = _plan_pg
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=MIGRACIONES)
+        yield explicar
+        db.session.rollback()
+
+@pytest.mark.parametrize("sql, indice", ACCESOS)
+def test_acceso_usa_indice(plan, sql, indice):
+    assert indice in plan(sql)
@@ -0,0 +1,11 @@
+"""generar_horario(workers=N) da el mismo resultado que en serie para una semilla."""
+from app import genetico as G
+
+
+def test_mismo_resultado_con_varios_procesos(problema):
+    corridas = [G.generar_horario(generaciones=4, tam=12, elite=2, seed=7, verbose=False,
+                                  max_seconds=600, workers=w)
+                for w in (1, 3)]
+    (best1, score1), (best3, score3) = corridas
+    assert score1 == score3
+    assert best1 == best3
@@ -0,0 +1,96 @@
+"""El barrido de _traslapes y la evaluación por buckets contra el cálculo
+original: doble ciclo sobre pares y el evaluador de la versión base."""
+import random
+from collections import defaultdict
+
+from app import genetico as G
+
+
+def _traslapes_doble_ciclo(slots):
+    n = 0
+    for i in range(len(slots)):
+        b1, b2 = slots[i][0], slots[i][1]
+        for j in range(i + 1, len(slots)):
+            c1, c2 = slots[j][0], slots[j][1]
+            if not (b2 < c1 or b1 > c2):
+                n += 1
+    return n
+
+def _evaluar_base(ind):
+    """Copia congelada de _fitness y _metrics de la versión base: (fitness, métricas)."""
+    m = dict.fromkeys(G.METRICAS, 0)
+    pen = 0
+    by_g_dia, by_d_doc, by_g_m_d = defaultdict(list), defaultdict(list), defaultdict(list)
+    by_docente = defaultdict(int)
+    for (g, dia, turno, b1, b2, mat, doc) in ind:
+        by_g_dia[(g, dia, turno)].append((b1, b2, mat, doc))
+        by_d_doc[(doc, dia, turno)].append((b1, b2, mat, g))
+        by_g_m_d[(g, mat, dia)].append((b1, b2))
+        by_docente[doc] += (b2 - b1 + 1)
+
+    for (g, dia, turno), slots in by_g_dia.items():
+        slots.sort()
+        for (b1, b2, mat, doc) in slots:
+            for (rb1, rb2, rmat) in G.RESERVAS.get((g, dia, turno), []):
+                if not (b2 < rb1 or b1 > rb2) and rmat != mat:
+                    pen += 10; m["violacion_reserva"] += 1
+        pen += _traslapes_doble_ciclo(slots) * 5
+        for i in range(len(slots) - 1):
+            _, b2_actual, mat_actual, _ = slots[i]
+            b1_siguiente, _, mat_siguiente, _ = slots[i + 1]
+            if mat_actual == mat_siguiente and b1_siguiente == b2_actual + 1:
+                bloques = b2_actual - slots[i][0] + 1 + (slots[i + 1][1] - b1_siguiente + 1)
+                if bloques > 2:
+                    pen += (bloques - 2) * 5; m["exceso_bloques_consecutivos"] += bloques - 2
+
+    for slots in by_d_doc.values():
+        slots.sort()
+        n = _traslapes_doble_ciclo(slots)
+        pen += n * 6; m["conflictos_docente"] += n
+
+    for (g, dia, turno, b1, b2, mat, doc) in ind:
+        if not any(b1 >= db1 and b2 <= db2 for (db1, db2) in G.DISP.get((doc, dia, turno), [])):
+            pen += 8; m["violacion_disponibilidad"] += 1
+        if G.MATERIAS[mat]["turno"] != turno:
+            pen += 4; m["turno_incorrecto"] += 1
+
+    count = defaultdict(int)
+    for (g, _, _, _, _, mat, _) in ind:
+        count[(g, mat)] += 1
+    for (g, mat, ses, dur, turno) in G.PLANES:
+        if count[(g, mat)] > ses:
+            pen += (count[(g, mat)] - ses) * 3; m["exceso_sesiones"] += count[(g, mat)] - ses
+        elif count[(g, mat)] < ses:
+            pen += (ses - count[(g, mat)]) * 3; m["falta_sesiones"] += ses - count[(g, mat)]
+
+    for lst in by_g_m_d.values():
+        exceso = max(0, sum(b2 - b1 + 1 for (b1, b2) in lst) - 2)
+        pen += exceso * 7; m["exceso_bloques_dia"] += exceso
+
+    for total_bloques in by_docente.values():
+        horas = total_bloques * 0.83
+        if horas > 35:
+            pen += int((horas - 35) * 10); m["exceso_horas_semanales"] += 1
+    return -pen, m
+
+
+def test_traslapes_igual_al_doble_ciclo():
+    rng = random.Random(0)
+    for _ in range(5000):
+        slots = []
+        for _ in range(rng.randint(0, 40)):
+            b1 = rng.randint(1, 8)
+            slots.append((b1, rng.randint(b1, min(8, b1 + 3)), rng.randint(1, 5), rng.randint(1, 5)))
+        assert G._traslapes(sorted(slots)) == _traslapes_doble_ciclo(slots)
+
+def test_fitness_y_metrics_igual_a_la_base(problema):
+    rng = random.Random(1)
+    random.seed(1)
+    pobl = [G._random_individuo(random.Random(s), init) for s, init in
+            enumerate(["restringido", "aleatorio"] * 5)]
+    for _ in range(200):
+        ind = G._mutate(rng.choice(pobl), pm=rng.choice([0.05, 0.3, 1.0]))
+        pobl.append(ind)
+        fit, met = _evaluar_base(ind)
+        assert G._fitness(ind) == fit
+        assert G._metrics(ind) == met